@@ -171,7 +171,12 @@ navigator.mediaDevices.getUserMedia({ audio: true })
                 connection_url="ws://localhost:6001/ws/chat",
                 message_formats={
                     "send": {
-                        "audio": {
+                        "audio_header": {
+                            "type": "audio_header",
+                            "timestamp": "2025-01-01T00:00:00Z"
+                        },
+                        "audio_body": "<audio_header 바로 다음 바이너리 프레임: WebM 오디오 원본 (Base64 아님)>",
+                        "audio (기존 방식)": {
                             "type": "audio",
                             "data": "<base64_encoded_audio>",
                             "timestamp": "2025-01-01T00:00:00Z"
@@ -203,6 +208,10 @@ navigator.mediaDevices.getUserMedia({ audio: true })
                             "theme": "casual",
                             "interval": 30,
                             "message": "자동 대화가 시작되었습니다."
+                        },
+                        "batch": {
+                            "type": "batch",
+                            "items": ["<위 형식의 메시지들 (보낸 순서대로)>"]
                         }
                     }
                 },
@@ -216,10 +225,14 @@ ws.onopen = () => {
     console.log('음성 대화 WebSocket 연결됨');
 };
 
-// 메시지 수신
+// 메시지 수신 (여러 메시지가 한꺼번에 준비되면 {type: 'batch', items: [...]}로 묶여 옴)
 ws.onmessage = (event) => {
     const data = JSON.parse(event.data);
+    const messages = data.type === 'batch' ? data.items : [data];
+    messages.forEach(handleMessage);
+};
 
+function handleMessage(data) {
     if (data.type === 'user_message') {
         console.log('사용자:', data.text);
 
@@ -238,7 +251,16 @@ ws.onmessage = (event) => {
     } else if (data.type === 'error') {
         console.error('대화 오류:', data.message);
     }
-};
+}
+
+// 녹음한 오디오 전송: 헤더(JSON) 다음 바이너리 프레임으로 원본 Blob 전송
+function sendAudio(audioBlob) {
+    ws.send(JSON.stringify({
+        type: 'audio_header',
+        timestamp: new Date().toISOString()
+    }));
+    ws.send(audioBlob);
+}
 
 // 자동 대화 시작
 function startAutoChat() {
@@ -249,7 +271,7 @@ function startAutoChat() {
     }));
 }
 
-// 음성 녹음 및 대화 (위의 STT 예제와 동일한 방식)
+// 음성 녹음은 위의 STT 예제와 같고, 녹음이 끝나면 sendAudio(audioBlob) 호출
 // ...
                     """
                 }
@@ -257,8 +279,8 @@ function startAutoChat() {
         ],
         common_patterns={
             "connection": "모든 WebSocket은 ws://localhost:6001/ws/<endpoint> 형식으로 연결",
-            "message_format": "JSON 형식 메시지, 'type' 필드로 메시지 구분",
-            "audio_encoding": "오디오 데이터는 Base64로 인코딩하여 'data' 필드에 전송",
+            "message_format": "JSON 형식 메시지, 'type' 필드로 메시지 구분 (/ws/chat은 여러 메시지를 {type: 'batch', items: [...]}로 묶어 보낼 수 있음)",
+            "audio_encoding": "/ws/chat은 audio_header 메시지 다음 바이너리 프레임으로 원본 오디오 전송, 그 외 엔드포인트는 Base64로 인코딩하여 'data' 필드에 전송",
             "error_handling": "모든 오류는 {type: 'error', error: '메시지'} 형식으로 응답",
             "timestamps": "선택적 timestamp 필드로 메시지 시간 추적 가능"
         },
@@ -378,7 +400,11 @@ chatSocket.onopen = () => console.log('음성 대화 연결됨');
 
 chatSocket.onmessage = (event) => {
     const data = JSON.parse(event.data);
+    // 한꺼번에 준비된 메시지는 batch로 묶여 오므로 풀어서 순서대로 처리
+    (data.type === 'batch' ? data.items : [data]).forEach(handleChatMessage);
+};
 
+function handleChatMessage(data) {
     if (data.type === 'user_message') {
         addMessage('사용자', data.text);
 
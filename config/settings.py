@@ -4,6 +4,7 @@
 """
 
 import os
+from importlib.util import find_spec
 from typing import Optional
 
 # 서버 설정
@@ -11,6 +12,17 @@ SERVER_HOST = "0.0.0.0"
 SERVER_PORT = 6001  # 기존 포트로 통합
 DEBUG = True
 
+# uvicorn 실행 옵션 - uvloop/httptools(C 구현)가 있으면 사용, 오디오 프레임(~1MB)을 수용하도록 WebSocket 한도 조정
+# 압축은 CPU 비용 대비 이득이 적으므로(오디오는 이미 압축됨) permessage-deflate 비활성화
+UVICORN_OPTIONS = {
+    "loop": "uvloop" if find_spec("uvloop") is not None else "asyncio",
+    "http": "httptools" if find_spec("httptools") is not None else "h11",
+    "ws": "websockets",
+    "ws_max_size": 16 * 1024 * 1024,
+    "ws_max_queue": 256,
+    "ws_per_message_deflate": False,
+}
+
 # TTS 설정
 DEFAULT_TTS_LANGUAGE = "KR"
 DEFAULT_TTS_SPEED = 1.0
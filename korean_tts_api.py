@@ -818,6 +818,7 @@ async def websocket_conversation(websocket: WebSocket):
 
 if __name__ == "__main__":
     import uvicorn
+    from config.settings import UVICORN_OPTIONS
     print("Korean TTS API 서버 시작...")
     print("사용법:")
     print("  POST /tts - 텍스트를 음성으로 변환")
@@ -827,4 +828,4 @@ if __name__ == "__main__":
     print("\n서버 주소: http://localhost:6001")
     print("WebSocket 주소: ws://localhost:6001/ws/tts")
 
-    uvicorn.run(app, host="0.0.0.0", port=6001)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=6001, **UVICORN_OPTIONS)
\ No newline at end of file
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Korean TTS Core
+GUI 애플리케이션들이 공유하는 TTS 백엔드 (모델 로딩, 음성 합성, WAV 저장)
+"""
+
+import os
+import re
+import sys
+import functools
+import threading
+import contextlib
+import collections
+import wave
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+# Numba가 있으면 클리핑 + int16 변환을 단일 패스 JIT 커널로 처리
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Add MeloTTS to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'MeloTTS'))
+
+_audio_initialized = False
+
+# 모델 로드 직후 워밍업용 짧은 문장 (언어별)
+WARMUP_TEXTS = {
+    "KR": "안녕하세요.",
+    "ZH": "你好。",
+    "JP": "こんにちは。",
+    "FR": "Bonjour.",
+    "ES": "Hola.",
+}
+
+def init_audio():
+    """pygame 믹서 초기화 (프로세스당 1회)"""
+    global _audio_initialized
+    if _audio_initialized:
+        return True
+
+    try:
+        import pygame
+        pygame.mixer.init()
+    except Exception:
+        return False
+
+    _audio_initialized = True
+    return True
+
+@functools.lru_cache(maxsize=1)
+def get_tts_class():
+    """melo.api.TTS 클래스 로드 (torch 포함 무거운 import는 최초 1회만 수행)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from melo.api import TTS
+    return TTS
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _to_pcm16_kernel(audio, out):
+        for i in prange(audio.shape[0]):
+            v = audio[i]
+            if v < -1.0:
+                v = -1.0
+            elif v > 1.0:
+                v = 1.0
+            out[i] = np.int16(v * 32767.0)
+
+def to_pcm16(audio):
+    """float 오디오(-1.0 ~ 1.0)를 int16 PCM으로 변환 (범위 초과 샘플은 클리핑)"""
+    audio = np.asarray(audio, dtype=np.float32)
+    if NUMBA_AVAILABLE and audio.ndim == 1:
+        pcm = np.empty(audio.shape[0], dtype=np.int16)
+        _to_pcm16_kernel(np.ascontiguousarray(audio), pcm)
+        return pcm
+
+    np.clip(audio, -1.0, 1.0, out=audio)
+    np.multiply(audio, 32767.0, out=audio)
+    return audio.astype(np.int16, copy=False)
+
+def write_wav(path, pcm, sample_rate):
+    """int16 PCM을 모노 WAV로 저장 (path는 파일 경로 또는 파일 객체)"""
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+class KoreanTTSCore:
+    """MeloTTS 모델 로딩과 음성 합성을 담당하는 UI 독립 백엔드"""
+
+    def __init__(self, max_cached_models=2):
+        self.tts_model = None
+        self.language = None
+        self.device = None
+
+        # (language, device, compiled) → TTS 모델 LRU 캐시 (언어 전환 시 재로딩 방지)
+        self.max_cached_models = max_cached_models
+        self._model_cache = collections.OrderedDict()
+        self._cache_lock = threading.Lock()  # 캐시 조회/삽입/해제에만 사용 (모델 생성 중에는 잡지 않음)
+        self._inflight = {}  # 생성 중인 key → Future (같은 모델을 중복 생성하지 않고 완료를 기다림)
+        self._just_evicted = False  # 캐시에서 모델이 해제된 뒤 아직 VRAM을 정리하지 않음
+
+        # 긴 입력에서 다음 문장 전처리(음소/BERT 특징)를 현재 문장 추론과 겹쳐 실행하는 스레드
+        self._prep_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tts-prep')
+
+    @property
+    def is_loaded(self):
+        return self.tts_model is not None
+
+    @property
+    def sample_rate(self):
+        return self.tts_model.hps.data.sampling_rate
+
+    def resolve_device(self, device):
+        """'auto' 디바이스를 실제 디바이스로 변환"""
+        if device != 'auto':
+            return device
+
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    def load(self, language='KR', device='cpu', warmup=False, compile_model=False, fp16=False):
+        """TTS 모델 로딩 (캐시에 있으면 재사용, warmup=True면 새 모델을 더미 합성으로 예열)
+
+        compile_model=True이면 CUDA에서 torch.compile로 추론 그래프를 컴파일 (CPU에서는 무시)
+        fp16은 워밍업 정밀도 - 실제 synthesize()에 넘길 값과 같아야 같은 커널 경로가 예열됨
+        """
+        device = self.resolve_device(device)
+        compile_model = compile_model and device == 'cuda'
+        key = (language, device, compile_model)
+
+        with self._cache_lock:
+            model = self._model_cache.get(key)
+            if model is not None:
+                self._model_cache.move_to_end(key)
+            future = self._inflight.get(key)
+            owner = model is None and future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if model is None:
+            if owner:
+                model = self._build_and_insert(key, future, warmup, fp16, speculative=False)
+            else:
+                # 다른 스레드(예: prefetch)가 같은 모델을 만드는 중이면 결과를 기다림
+                model = future.result()
+                with self._cache_lock:
+                    if key in self._model_cache:
+                        self._model_cache.move_to_end(key)
+
+        self.tts_model = model
+        self.language = language
+        self.device = device
+        return self.tts_model
+
+    def prefetch(self, language, device='cpu', compile_model=False, fp16=False):
+        """캐시에 빈 자리가 있으면 모델을 미리 로드 (현재 모델은 바꾸지 않음)"""
+        device = self.resolve_device(device)
+        compile_model = compile_model and device == 'cuda'
+        key = (language, device, compile_model)
+
+        with self._cache_lock:
+            if (key in self._model_cache or key in self._inflight
+                    or len(self._model_cache) + len(self._inflight) >= self.max_cached_models):
+                return False
+            future = self._inflight[key] = Future()
+
+        self._build_and_insert(key, future, warmup=True, fp16=fp16, speculative=True)
+        return True
+
+    def _build_and_insert(self, key, future, warmup, fp16, speculative):
+        """락 밖에서 모델을 생성한 뒤 락을 잡고 캐시에 삽입/해제 (대기 중인 스레드에는 future로 전달)"""
+        language, device, compile_model = key
+        try:
+            model = self._build_model(language, device, compile_model, warmup, fp16)
+        except BaseException as e:
+            with self._cache_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._cache_lock:
+            self._inflight.pop(key, None)
+            self._model_cache[key] = model
+            # 추측성 로드는 캐시가 넘칠 때 가장 먼저 해제되도록 배치
+            self._model_cache.move_to_end(key, last=not speculative)
+            self._evict_models(device)
+        future.set_result(model)
+        return model
+
+    def vram_free_gb(self):
+        """현재 GPU의 여유 VRAM (GB)"""
+        import torch
+        free, _ = torch.cuda.mem_get_info()
+        return free / 1024**3
+
+    def _build_model(self, language, device, compile_model, warmup, fp16=False):
+        """모델 생성 + 선택적 컴파일/워밍업
+
+        torch.compile은 첫 호출 때 실제로 컴파일하므로, 컴파일한 모델은 항상 워밍업으로 검증하고
+        실패하면 원래(eager) infer로 되돌림
+        """
+        model = self._create_model(language, device)
+        eager_infer = self._compile_model(model) if compile_model else None
+        if warmup or eager_infer is not None:
+            if not self._warmup_model(model, language, device, fp16) and eager_infer is not None:
+                print("컴파일된 모델 워밍업 실패 - eager 모드로 되돌림")
+                model.model.infer = eager_infer
+                if warmup:
+                    self._warmup_model(model, language, device, fp16)
+        return model
+
+    def _create_model(self, language, device):
+        """TTS 모델 생성"""
+        # VRAM 최적화 설정 (10GB VRAM 대응)
+        if device == 'cuda':
+            import torch
+            # VRAM 정리는 모델이 해제됐거나 여유 VRAM이 20% 미만일 때만 (불필요한 동기화 방지)
+            free, total = torch.cuda.mem_get_info()
+            if self._just_evicted or free / total < 0.2:
+                torch.cuda.empty_cache()
+                self._just_evicted = False
+            if torch.cuda.is_available():
+                print(f"CUDA device: {torch.cuda.get_device_name()}")
+                print(f"VRAM 사용량: {torch.cuda.memory_allocated()/1024**3:.1f}GB / {torch.cuda.memory_reserved()/1024**3:.1f}GB")
+
+        # CPU 추론 시 intra-op 스레드가 모든 코어를 점유하면 Tk 메인 루프가 끊기므로 1개 코어를 남김
+        # (torch 연산은 이미 커널 실행 중 GIL을 해제하므로 별도 nogil 래퍼는 불필요)
+        if device == 'cpu':
+            import torch
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) - 1))
+
+        TTS = get_tts_class()
+
+        # 경고 억제는 MeloTTS 관련 구간에만 적용 (전역 필터는 추론 중 오버헤드 발생)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return TTS(language=language, device=device)
+
+    def _compile_model(self, model):
+        """MeloTTS 추론 경로를 torch.compile로 감싸고 원래 infer 반환 (torch 2.x 미만이거나 실패 시 None)"""
+        import torch
+        if not hasattr(torch, 'compile'):
+            return None
+
+        eager_infer = model.model.infer
+        try:
+            # melo는 forward가 아닌 infer()를 호출하므로 해당 메서드를 컴파일
+            model.model.infer = torch.compile(eager_infer, mode='reduce-overhead')
+        except Exception as e:
+            print(f"모델 컴파일 실패 (무시): {e}")
+            return None
+        return eager_infer
+
+    def _warmup_model(self, model, language, device, fp16=False):
+        """짧은 문장을 한 번 합성해 커널 초기화/autotune 비용을 로딩 단계에서 처리 (성공 여부 반환)"""
+        try:
+            with warnings.catch_warnings(), self._inference_context(device, fp16):
+                warnings.simplefilter("ignore")
+                model.tts_to_file(
+                    text=WARMUP_TEXTS.get(language, "Hello."),
+                    speaker_id=0,
+                    output_path=None,
+                    speed=1.0,
+                    quiet=True
+                )
+            if device == 'cuda':
+                import torch
+                torch.cuda.synchronize()
+        except Exception as e:
+            print(f"모델 워밍업 실패: {e}")
+            return False
+        return True
+
+    def _evict_models(self, device):
+        """캐시 크기를 넘는 가장 오래된 모델 해제 (VRAM 정리는 다음 모델 생성 시 수행)"""
+        while len(self._model_cache) > self.max_cached_models:
+            _, old_model = self._model_cache.popitem(last=False)
+            del old_model
+            if device == 'cuda':
+                self._just_evicted = True
+
+    def unload(self):
+        """모델 해제"""
+        self.tts_model = None
+
+    def _inference_context(self, device, fp16):
+        """추론 컨텍스트 (autograd 비활성화, CUDA에서는 선택적으로 FP16 autocast)"""
+        import torch
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if fp16 and device == 'cuda':
+            stack.enter_context(torch.autocast(device_type='cuda', dtype=torch.float16))
+        return stack
+
+    def synthesize(self, text, speed=1.0, speaker_id=0, fp16=False):
+        """텍스트를 int16 PCM 오디오로 변환 → (pcm, sample_rate)"""
+        model = self.tts_model
+        with warnings.catch_warnings(), self._inference_context(self.device, fp16):
+            warnings.simplefilter("ignore")
+            pieces = model.split_sentences_into_pieces(text, model.language, quiet=True)
+            if len(pieces) > 1:
+                audio = self._synthesize_pieces(model, pieces, speed, speaker_id)
+            else:
+                audio = model.tts_to_file(
+                    text=text,
+                    speaker_id=speaker_id,
+                    output_path=None,
+                    speed=speed,
+                    quiet=True
+                )
+
+        return to_pcm16(audio), self.sample_rate
+
+    def _synthesize_pieces(self, model, pieces, speed, speaker_id):
+        """문장별 합성 - 다음 문장 전처리를 별도 스레드(CUDA에서는 별도 스트림)에서 미리 수행"""
+        import torch
+        from melo import utils
+
+        device = model.device
+        prep_stream = torch.cuda.Stream() if str(device).startswith('cuda') else None
+
+        def prepare(text):
+            if model.language in ['EN', 'ZH_MIX_EN']:
+                text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+            stream_context = torch.cuda.stream(prep_stream) if prep_stream else contextlib.nullcontext()
+            with torch.inference_mode(), stream_context:
+                inputs = utils.get_text_for_tts_infer(text, model.language, model.hps, device, model.symbol_to_id)
+            if prep_stream:
+                prep_stream.synchronize()
+            return inputs
+
+        audio_list = []
+        pending = self._prep_pool.submit(prepare, pieces[0])
+        for i in range(len(pieces)):
+            bert, ja_bert, phones, tones, lang_ids = pending.result()
+            if i + 1 < len(pieces):
+                pending = self._prep_pool.submit(prepare, pieces[i + 1])
+
+            x_tst = phones.to(device).unsqueeze(0)
+            x_tst_lengths = torch.LongTensor([phones.size(0)]).to(device)
+            speakers = torch.LongTensor([speaker_id]).to(device)
+            audio = model.model.infer(
+                x_tst, x_tst_lengths, speakers,
+                tones.to(device).unsqueeze(0), lang_ids.to(device).unsqueeze(0),
+                bert.to(device).unsqueeze(0), ja_bert.to(device).unsqueeze(0),
+                sdp_ratio=0.2, noise_scale=0.6, noise_scale_w=0.8, length_scale=1. / speed,
+            )[0][0, 0].data.cpu().float().numpy()
+            audio_list.append(audio)
+
+        return model.audio_numpy_concat(audio_list, sr=model.hps.data.sampling_rate, speed=speed)
+
+    def synthesize_to_file(self, path, text, speed=1.0, speaker_id=0, fp16=False):
+        """텍스트를 음성으로 변환하여 WAV 파일로 저장"""
+        pcm, sample_rate = self.synthesize(text, speed=speed, speaker_id=speaker_id, fp16=fp16)
+        write_wav(path, pcm, sample_rate)
+        return path
@@ -6,21 +6,19 @@ Korean TTS GUI Application
 
 import os
 import sys
+import atexit
+import errno
+import shutil
 import threading
 import tempfile
-import warnings
+import wave
 from pathlib import Path
 
-warnings.filterwarnings("ignore")
-
-# Add MeloTTS to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'MeloTTS'))
-
 try:
     import customtkinter as ctk
     import pygame
     from tkinter import filedialog, messagebox
-    from melo.api import TTS
+    from korean_tts_core import KoreanTTSCore, init_audio
 except ImportError as e:
     print(f"필요한 패키지가 설치되지 않았습니다: {e}")
     sys.exit(1)
@@ -36,12 +34,16 @@ class KoreanTTSGUI:
         self.root.geometry("800x600")
         self.root.resizable(True, True)
 
-        # TTS model
-        self.tts_model = None
+        # TTS 백엔드 (모델 로딩/합성은 KoreanTTSCore에 위임)
+        self.core = KoreanTTSCore()
         self.current_audio_file = None
+        self._current_audio_valid = False  # 변환 완료 여부 (재생/저장 시 stat 호출 대신 사용)
+        self._temp_audio_file = None  # 종료 시 정리할 임시 파일
+        atexit.register(self._cleanup_temp_audio)
+        self._playback_job = None
 
         # Pygame mixer 초기화
-        pygame.mixer.init()
+        init_audio()
 
         self.setup_ui()
         self.load_model()
@@ -200,7 +202,7 @@ class KoreanTTSGUI:
                 self.status_label.configure(text="한국어 TTS 모델 로딩 중...")
                 self.progress.set(0.3)
 
-                self.tts_model = TTS(language='KR', device='cpu')
+                self.core.load(language='KR', device='cpu', warmup=True)
 
                 self.progress.set(1.0)
                 self.status_label.configure(text="✅ 모델 로딩 완료! 텍스트를 입력하고 변환 버튼을 눌러주세요.")
@@ -219,7 +221,7 @@ class KoreanTTSGUI:
 
     def convert_text(self):
         """텍스트를 음성으로 변환"""
-        if not self.tts_model:
+        if not self.core.is_loaded:
             messagebox.showerror("오류", "TTS 모델이 로드되지 않았습니다.")
             return
 
@@ -256,15 +258,12 @@ class KoreanTTSGUI:
             self.progress.set(0.3)
 
             # TTS 변환
-            self.tts_model.tts_to_file(
-                text=text,
-                speaker_id=speaker_id,
-                output_path=temp_path,
-                speed=speed,
-                quiet=True
-            )
+            self.core.synthesize_to_file(temp_path, text, speed=speed, speaker_id=speaker_id)
 
+            self._cleanup_temp_audio()
             self.current_audio_file = temp_path
+            self._temp_audio_file = temp_path
+            self._current_audio_valid = True
             self.progress.set(1.0)
 
             # UI 업데이트
@@ -281,7 +280,7 @@ class KoreanTTSGUI:
 
     def play_audio(self):
         """음성 재생"""
-        if not self.current_audio_file or not os.path.exists(self.current_audio_file):
+        if not self._current_audio_valid:
             messagebox.showwarning("경고", "재생할 음성 파일이 없습니다.")
             return
 
@@ -293,23 +292,38 @@ class KoreanTTSGUI:
             self.play_button.configure(state="disabled")
             self.stop_button.configure(state="normal")
 
-            # 재생 완료 확인
-            self.check_playback()
+            # 재생 길이만큼 한 번만 대기 후 완료 처리 (주기적 폴링 대신)
+            duration = self._get_audio_duration(self.current_audio_file)
+            self._playback_job = self.root.after(int(duration * 1000), self.check_playback)
 
         except Exception as e:
             messagebox.showerror("오류", f"음성 재생 중 오류가 발생했습니다:\\n{str(e)}")
 
+    def _get_audio_duration(self, path):
+        """WAV 헤더에서 재생 길이(초) 계산"""
+        try:
+            with wave.open(path, 'rb') as wav_file:
+                return wav_file.getnframes() / float(wav_file.getframerate())
+        except (wave.Error, OSError):
+            return 0.0
+
     def check_playback(self):
-        """재생 상태 확인"""
+        """재생 완료 처리"""
         if pygame.mixer.music.get_busy():
-            self.root.after(100, self.check_playback)
-        else:
-            self.status_label.configure(text="▶️ 재생 완료")
-            self.play_button.configure(state="normal")
-            self.stop_button.configure(state="disabled")
+            # 믹서 버퍼 지연으로 아직 재생 중이면 잠시 후 한 번 더 확인
+            self._playback_job = self.root.after(50, self.check_playback)
+            return
+
+        self._playback_job = None
+        self.status_label.configure(text="▶️ 재생 완료")
+        self.play_button.configure(state="normal")
+        self.stop_button.configure(state="disabled")
 
     def stop_audio(self):
         """음성 정지"""
+        if self._playback_job is not None:
+            self.root.after_cancel(self._playback_job)
+            self._playback_job = None
         pygame.mixer.music.stop()
         self.status_label.configure(text="⏹️ 재생 정지")
         self.play_button.configure(state="normal")
@@ -317,7 +331,7 @@ class KoreanTTSGUI:
 
     def save_audio(self):
         """음성 파일 저장"""
-        if not self.current_audio_file or not os.path.exists(self.current_audio_file):
+        if not self._current_audio_valid:
             messagebox.showwarning("경고", "저장할 음성 파일이 없습니다.")
             return
 
@@ -329,13 +343,34 @@ class KoreanTTSGUI:
 
         if file_path:
             try:
-                import shutil
-                shutil.copy2(self.current_audio_file, file_path)
+                if self.current_audio_file == self._temp_audio_file:
+                    # 임시 파일은 버려지는 파일이므로 복사 대신 이동 (다른 파일시스템이면 copyfile로 대체)
+                    try:
+                        os.replace(self.current_audio_file, file_path)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                        shutil.copyfile(self.current_audio_file, file_path)
+                        os.unlink(self.current_audio_file)
+                    self.current_audio_file = file_path
+                    self._temp_audio_file = None
+                else:
+                    # 이미 사용자가 저장한 파일이면 원본은 그대로 두고 복사
+                    shutil.copyfile(self.current_audio_file, file_path)
                 self.status_label.configure(text=f"💾 파일 저장 완료: {os.path.basename(file_path)}")
                 messagebox.showinfo("성공", f"음성 파일이 저장되었습니다:\\n{file_path}")
             except Exception as e:
                 messagebox.showerror("오류", f"파일 저장 중 오류가 발생했습니다:\\n{str(e)}")
 
+    def _cleanup_temp_audio(self):
+        """이전 변환의 임시 파일 삭제"""
+        if self._temp_audio_file:
+            try:
+                os.unlink(self._temp_audio_file)
+            except OSError:
+                pass
+            self._temp_audio_file = None
+
     def run(self):
         """GUI 실행"""
         self.root.mainloop()
@@ -4,18 +4,17 @@ Korean TTS GUI Application - Final Working Version
 한국어 텍스트를 음성으로 변환하는 GUI 애플리케이션
 """
 
+import io
 import os
 import sys
+import asyncio
 import threading
-import tempfile
-import warnings
-import glob
+from concurrent.futures import ThreadPoolExecutor
+import json
+import functools
 from pathlib import Path
 
-warnings.filterwarnings("ignore")
-
-# Add MeloTTS to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'MeloTTS'))
+from korean_tts_core import KoreanTTSCore, get_tts_class, init_audio, write_wav
 
 # Try importing GUI libraries
 try:
@@ -29,47 +28,122 @@ except ImportError:
     from tkinter import ttk, messagebox, filedialog
     USE_MODERN_UI = False
 
-# Try importing audio
+# Try importing audio (저지연 sounddevice 우선, 없으면 pygame)
 try:
-    import pygame
-    AUDIO_AVAILABLE = True
-    pygame.mixer.init()
-except ImportError:
-    AUDIO_AVAILABLE = False
+    import sounddevice as sd
+    AUDIO_BACKEND = "sounddevice"
+except (ImportError, OSError):
+    try:
+        import pygame
+        AUDIO_BACKEND = "pygame" if init_audio() else None
+    except ImportError:
+        AUDIO_BACKEND = None
+AUDIO_AVAILABLE = AUDIO_BACKEND is not None
 
-def find_model_files():
-    """시스템에서 사용 가능한 TTS 모델 파일들을 찾기"""
+MODEL_INDEX_PATH = os.path.expanduser("~/.cache/plobin_tts/model_index.json")
+HF_CACHE_DIR = os.path.expanduser("~/.cache/huggingface/hub")
+DEFAULT_LANGUAGES = ["KR", "EN", "EN_V2", "EN_NEWEST", "ZH", "JP", "FR", "ES"]
+
+# 자주 번갈아 쓰는 언어 쌍 (로드 후 VRAM 여유가 있으면 상대 언어 모델을 미리 로드)
+PREFETCH_LANGUAGES = {"KR": "EN", "EN": "KR"}
+PREFETCH_MIN_FREE_VRAM_GB = 4
+
+def _dir_mtime(path):
+    """디렉토리 mtime (없으면 None)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _walk_model_files(root, mtimes, stop_at=None):
+    """root 이하를 os.scandir로 한 번만 순회하며 모델 파일 수집 (stop_at 파일을 찾으면 즉시 중단)"""
+    found = {"pytorch_model.bin": [], "checkpoint.pth": []}
+    pending = [root]
+    while pending:
+        dirpath = pending.pop()
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.name in found:
+                        found[entry.name].append(entry.path)
+                    elif entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+        except OSError:
+            continue
+
+        mtimes[dirpath] = _dir_mtime(dirpath)
+        if stop_at and found[stop_at]:
+            break
+    return found
+
+def _scan_model_files():
+    """로컬 models 디렉토리와 Hugging Face 캐시에서 모델 파일 검색"""
     model_files = {}
+    local_root = os.path.abspath("models")
+    mtimes = {local_root: _dir_mtime(local_root), HF_CACHE_DIR: _dir_mtime(HF_CACHE_DIR)}
 
     # 로컬 models 디렉토리
-    local_models = glob.glob("models/**/checkpoint.pth", recursive=True)
-    for model_path in local_models:
+    for model_path in _walk_model_files(local_root, mtimes)["checkpoint.pth"]:
         model_name = os.path.basename(os.path.dirname(model_path))
         model_files[f"Local: {model_name}"] = model_path
 
     # Hugging Face 캐시
-    hf_cache = os.path.expanduser("~/.cache/huggingface/hub")
-    if os.path.exists(hf_cache):
-        for item in os.listdir(hf_cache):
+    if os.path.exists(HF_CACHE_DIR):
+        for item in os.listdir(HF_CACHE_DIR):
             if "melotts" in item.lower() or "tts" in item.lower():
-                model_path = os.path.join(hf_cache, item)
-                # 실제 모델 파일이 있는지 확인
-                pth_files = glob.glob(f"{model_path}/**/pytorch_model.bin", recursive=True)
-                if not pth_files:
-                    pth_files = glob.glob(f"{model_path}/**/checkpoint.pth", recursive=True)
+                found = _walk_model_files(os.path.join(HF_CACHE_DIR, item), mtimes,
+                                          stop_at="pytorch_model.bin")
+                # 실제 모델 파일이 있는지 확인 (pytorch_model.bin 우선)
+                pth_files = found["pytorch_model.bin"] or found["checkpoint.pth"]
                 if pth_files:
                     display_name = item.replace("models--", "").replace("--", "/")
                     model_files[f"HF: {display_name}"] = pth_files[0]
 
-    # 기본 언어 옵션도 포함
-    default_languages = ["KR", "EN", "EN_V2", "EN_NEWEST", "ZH", "JP", "FR", "ES"]
-    for lang in default_languages:
-        model_files[f"언어: {lang}"] = f"language:{lang}"
+    return model_files, mtimes
+
+def _load_model_index():
+    """저장된 모델 인덱스 로드 (순회했던 디렉토리 중 하나라도 변경되었으면 None)"""
+    try:
+        with open(MODEL_INDEX_PATH, encoding="utf-8") as f:
+            index = json.load(f)
+        if any(_dir_mtime(path) != mtime for path, mtime in index["mtimes"].items()):
+            return None
+        return index["model_files"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+def _save_model_index(model_files, mtimes):
+    try:
+        os.makedirs(os.path.dirname(MODEL_INDEX_PATH), exist_ok=True)
+        with open(MODEL_INDEX_PATH, "w", encoding="utf-8") as f:
+            json.dump({"model_files": model_files, "mtimes": mtimes}, f, ensure_ascii=False)
+    except OSError:
+        pass
 
+@functools.lru_cache(maxsize=1)
+def find_model_files():
+    """시스템에서 사용 가능한 TTS 모델 파일들을 찾기"""
+    model_files = _load_model_index()
+    if model_files is None:
+        model_files, mtimes = _scan_model_files()
+        _save_model_index(model_files, mtimes)
+
+    # 기본 언어 옵션도 포함
+    model_files.update(language_model_options())
     return model_files
 
+def language_model_options():
+    """기본 언어 모델 옵션 (파일 검색 없이 바로 사용 가능)"""
+    return {f"언어: {lang}": f"language:{lang}" for lang in DEFAULT_LANGUAGES}
+
 class KoreanTTSGUI:
     def __init__(self):
+        # 모든 백그라운드 작업(import, 모델 검색/로딩, 합성, 저장)은 공용 스레드 풀에서 실행
+        # torch / MeloTTS import는 창 생성, UI 구성과 병렬로 미리 수행
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='tts')
+        self._prewarm = self._pool.submit(self._prewarm_imports)
+        self._convert_future = None
+
         if USE_MODERN_UI:
             self.root = ctk.CTk()
         else:
@@ -78,18 +152,47 @@ class KoreanTTSGUI:
         self.root.title("MeloTTS - 다국어 음성 변환기")
         self.root.geometry("800x500")
 
-        self.tts_model = None
-        self.current_audio_file = None
+        self.core = KoreanTTSCore()  # 모델 로딩/합성 백엔드
+        self._last_audio = None  # 마지막 변환 결과 (pcm, sample_rate) - 저장 시에만 WAV로 기록
+        self._sound = None
         self.current_language = None
         self.model_loading = False  # 모델 로딩 중복 방지
+        self._prefetch_submitted = False  # 다음 언어 모델 선로딩은 1회만
 
-        # 사용 가능한 모델 파일들 검색
-        self.model_files = find_model_files()
-        print(f"발견된 모델 파일: {len(self.model_files)}개")
+        # 합성/파일 I/O용 asyncio 루프 (Tk 메인 루프를 막지 않도록 별도 스레드에서 실행)
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._pool)  # asyncio.to_thread도 공용 풀 사용
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+        # 기본 언어 옵션으로 먼저 UI를 구성하고, 모델 파일 검색은 백그라운드에서 수행
+        self.model_files = language_model_options()
 
         self.setup_ui()
+        self._pool.submit(self._discover_models)
         self.load_model()
 
+    def _prewarm_imports(self):
+        """무거운 모듈 미리 import (실패 시 load_model에서 다시 시도하여 오류 표시)"""
+        try:
+            get_tts_class()
+        except Exception:
+            pass
+
+    def _discover_models(self):
+        """모델 파일 검색 후 Tk 스레드에서 모델 목록 갱신"""
+        model_files = find_model_files()
+        self.root.after(0, self._on_models_found, model_files)
+
+    def _on_models_found(self, model_files):
+        self.model_files = model_files
+        print(f"발견된 모델 파일: {len(model_files)}개")
+
+        model_options = list(model_files.keys())
+        if USE_MODERN_UI:
+            self.model_menu.configure(values=model_options)
+        else:
+            self.model_combo.configure(values=model_options)
+
     def setup_ui(self):
         """UI 구성"""
         if USE_MODERN_UI:
@@ -127,10 +230,10 @@ class KoreanTTSGUI:
         model_label.pack(side="left", padx=15, pady=10)
 
         self.model_var = tk.StringVar(value="언어: KR")
-        self.model_var.trace('w', self.on_model_change)  # 모델 변경 감지
         model_options = list(self.model_files.keys())
         self.model_menu = ctk.CTkOptionMenu(settings_frame, values=model_options,
-                                          variable=self.model_var, width=150)
+                                          variable=self.model_var, width=150,
+                                          command=self.on_model_change)  # 사용자 선택 시에만 호출
         self.model_menu.pack(side="left", padx=10, pady=10)
 
         # Device selection
@@ -157,6 +260,16 @@ class KoreanTTSGUI:
                                 font=ctk.CTkFont(size=10))
         speed_info.pack(side="left", padx=10, pady=10)
 
+        # FP16 (CUDA에서만 적용)
+        self.fp16_var = tk.BooleanVar(value=True)
+        fp16_check = ctk.CTkCheckBox(settings_frame, text="FP16", variable=self.fp16_var, width=60)
+        fp16_check.pack(side="left", padx=10, pady=10)
+
+        # torch.compile (CUDA에서만 적용, 다음 모델 로딩부터 반영)
+        self.compile_var = tk.BooleanVar(value=True)
+        compile_check = ctk.CTkCheckBox(settings_frame, text="Compile", variable=self.compile_var, width=80)
+        compile_check.pack(side="left", padx=10, pady=10)
+
         # Buttons
         button_frame = ctk.CTkFrame(main_frame)
         button_frame.pack(pady=15)
@@ -216,10 +329,11 @@ class KoreanTTSGUI:
         # Model selection
         tk.Label(settings_frame, text="모델:").pack(side="left", padx=10, pady=5)
         self.model_var = tk.StringVar(value="언어: KR")
-        self.model_var.trace('w', self.on_model_change)  # 모델 변경 감지
         model_options = list(self.model_files.keys())
         self.model_combo = ttk.Combobox(settings_frame, textvariable=self.model_var,
                                       values=model_options, state="readonly", width=15)
+        self.model_combo.bind("<<ComboboxSelected>>",
+                              lambda event: self.on_model_change(self.model_var.get()))
         self.model_combo.pack(side="left", padx=5, pady=5)
 
         # Device selection
@@ -235,6 +349,14 @@ class KoreanTTSGUI:
         tk.Entry(settings_frame, textvariable=self.speed_var, width=8).pack(side="left", padx=5, pady=5)
         tk.Label(settings_frame, text="(0.5-2.0)").pack(side="left", padx=5, pady=5)
 
+        # FP16 (CUDA에서만 적용)
+        self.fp16_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(settings_frame, text="FP16", variable=self.fp16_var).pack(side="left", padx=5, pady=5)
+
+        # torch.compile (CUDA에서만 적용, 다음 모델 로딩부터 반영)
+        self.compile_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(settings_frame, text="Compile", variable=self.compile_var).pack(side="left", padx=5, pady=5)
+
         # Buttons
         button_frame = tk.Frame(main_frame)
         button_frame.pack(pady=15)
@@ -265,27 +387,13 @@ class KoreanTTSGUI:
         def load():
             try:
                 self.model_loading = True  # 로딩 시작
+                self._prewarm.result()  # 미리 시작한 import 완료 대기
 
                 # 실제 모델 로드 - 사용자 선택 모델/디바이스 사용
-                import torch
-                from melo.api import TTS
-
                 model_selection = self.model_var.get()
                 model_path = self.model_files.get(model_selection)
 
-                device_choice = self.device_var.get()
-                if device_choice == 'auto':
-                    device = 'cuda' if torch.cuda.is_available() else 'cpu'
-                else:
-                    device = device_choice
-
-                # VRAM 최적화 설정 (10GB VRAM 대응)
-                if device == 'cuda':
-                    torch.cuda.empty_cache()  # VRAM 정리
-                    # VRAM 사용량 모니터링
-                    if torch.cuda.is_available():
-                        print(f"CUDA device: {torch.cuda.get_device_name()}")
-                        print(f"VRAM 사용량: {torch.cuda.memory_allocated()/1024**3:.1f}GB / {torch.cuda.memory_reserved()/1024**3:.1f}GB")
+                device = self.core.resolve_device(self.device_var.get())
 
                 # 모델 로드 방식 결정
                 if model_path.startswith("language:"):
@@ -293,14 +401,17 @@ class KoreanTTSGUI:
                     language = model_path.split(":")[1]
                     print(f"Using language model: {language}, device: {device}")
                     self.update_status(f"{language} 모델 로딩 중... ({device})")
-                    self.tts_model = TTS(language=language, device=device)
+                    self.core.load(language=language, device=device, warmup=True,
+                                   compile_model=self.compile_var.get(), fp16=self.fp16_var.get())
                     self.current_model = language
+                    self._maybe_prefetch(language)
                 else:
                     # 파일 기반 로드 (향후 확장 가능)
                     language = "KR"  # 기본값
                     print(f"Using custom model: {model_selection}, device: {device}")
                     self.update_status(f"{model_selection} 모델 로딩 중... ({device})")
-                    self.tts_model = TTS(language=language, device=device)
+                    self.core.load(language=language, device=device, warmup=True,
+                                   compile_model=self.compile_var.get(), fp16=self.fp16_var.get())
                     self.current_model = model_selection
 
                 self.update_status("✅ 모델 로딩 완료! 텍스트를 입력하고 변환하세요.")
@@ -316,21 +427,43 @@ class KoreanTTSGUI:
             finally:
                 self.model_loading = False  # 로딩 완료
 
-        threading.Thread(target=load, daemon=True).start()
+        self._pool.submit(load)
+
+    def _maybe_prefetch(self, language):
+        """GPU 여유가 있으면 다음에 쓸 가능성이 높은 언어 모델을 백그라운드에서 미리 로드"""
+        next_language = PREFETCH_LANGUAGES.get(language)
+        if self._prefetch_submitted or not next_language or self.core.device != 'cuda':
+            return
+        if self.core.vram_free_gb() <= PREFETCH_MIN_FREE_VRAM_GB:
+            return
+
+        self._prefetch_submitted = True
+        # 공용 풀(로드/변환용 2개 워커)을 점유하지 않도록 별도 데몬 스레드에서 실행
+        threading.Thread(
+            target=self._prefetch_model,
+            args=(next_language, self.compile_var.get(), self.fp16_var.get()),
+            name='tts-prefetch', daemon=True
+        ).start()
 
-    def on_model_change(self, *args):
-        """모델 변경 시 자동으로 모델 재로드"""
+    def _prefetch_model(self, language, compile_model, fp16):
+        try:
+            if self.core.prefetch(language, device='cuda', compile_model=compile_model, fp16=fp16):
+                print(f"{language} 모델 미리 로드 완료")
+        except Exception as e:
+            print(f"{language} 모델 미리 로드 실패 (무시): {e}")
+
+    def on_model_change(self, choice):
+        """모델 선택 시 자동으로 모델 재로드"""
         if self.model_loading:
             return  # 이미 로딩 중이면 무시
 
-        new_model = self.model_var.get()
-        if hasattr(self, 'current_model') and self.current_model and self.current_model != new_model:
-            print(f"모델 변경 감지: {self.current_model} → {new_model}")
+        if hasattr(self, 'current_model') and self.current_model and self.current_model != choice:
+            print(f"모델 변경 감지: {self.current_model} → {choice}")
             self.reload_model()
 
     def reload_model(self):
         """모델 재로드"""
-        self.tts_model = None
+        self.core.unload()
         self.disable_button(self.convert_button)
         if hasattr(self, 'play_button'):
             self.disable_button(self.play_button)
@@ -338,58 +471,61 @@ class KoreanTTSGUI:
         self.load_model()
 
     def convert_text_threaded(self):
-        """텍스트 변환 (스레드)"""
-        threading.Thread(target=self.convert_text, daemon=True).start()
+        """텍스트 변환 (asyncio 루프에 예약)"""
+        request = self.convert_text()
+        if request:
+            # 아직 시작되지 않은 이전 변환 요청은 취소
+            if self._convert_future is not None and not self._convert_future.done():
+                self._convert_future.cancel()
+            self._convert_future = asyncio.run_coroutine_threadsafe(self._aconvert(*request), self._loop)
 
     def convert_text(self):
-        """텍스트를 음성으로 변환"""
-        if not self.tts_model:
+        """변환 입력 검증 후 (text, speed, fp16) 반환"""
+        if not self.core.is_loaded:
             self.show_error("TTS 모델이 로드되지 않았습니다.")
-            return
+            return None
 
         text = self.get_text_input().strip()
         if not text:
             self.show_warning("변환할 텍스트를 입력해주세요.")
-            return
+            return None
 
+        # 속도 설정
         try:
-            self.update_status("🔄 음성 변환 중...")
-            self.disable_button(self.convert_button)
+            speed = float(self.speed_var.get())
+            speed = max(0.5, min(2.0, speed))
+        except:
+            speed = 1.0
 
-            # 속도 설정
-            try:
-                speed = float(self.speed_var.get())
-                speed = max(0.5, min(2.0, speed))
-            except:
-                speed = 1.0
-
-            # 임시 파일 생성
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
-
-            # TTS 변환 실행
-            self.tts_model.tts_to_file(
-                text=text,
-                speaker_id=0,
-                output_path=temp_path,
-                speed=speed,
-                quiet=True
-            )
-
-            self.current_audio_file = temp_path
-            self.update_status("✅ 음성 변환 완료!")
-
-            # 버튼 활성화
-            if AUDIO_AVAILABLE:
-                self.enable_button(self.play_button)
-            self.enable_button(self.save_button)
-            self.enable_button(self.save_model_button)  # 모델별 저장 버튼도 활성화
-            self.enable_button(self.convert_button)
+        self.update_status("🔄 음성 변환 중...")
+        self.disable_button(self.convert_button)
+        return text, speed, self.fp16_var.get()
 
+    async def _aconvert(self, text, speed, fp16):
+        """텍스트를 음성으로 변환 (합성은 작업 스레드에서 실행, 결과는 메모리에 유지)"""
+        try:
+            audio = await asyncio.to_thread(self.core.synthesize, text, speed=speed, speaker_id=0, fp16=fp16)
         except Exception as e:
-            self.update_status(f"❌ 변환 실패: {str(e)}")
-            self.enable_button(self.convert_button)
-            self.show_error(f"음성 변환 오류:\\n{str(e)}")
+            self.root.after(0, self._on_convert_failed, e)
+        else:
+            self.root.after(0, self._on_convert_done, audio)
+
+    def _on_convert_done(self, audio):
+        self._last_audio = audio
+        self._sound = None
+        self.update_status("✅ 음성 변환 완료!")
+
+        # 버튼 활성화
+        if AUDIO_AVAILABLE:
+            self.enable_button(self.play_button)
+        self.enable_button(self.save_button)
+        self.enable_button(self.save_model_button)  # 모델별 저장 버튼도 활성화
+        self.enable_button(self.convert_button)
+
+    def _on_convert_failed(self, e):
+        self.update_status(f"❌ 변환 실패: {str(e)}")
+        self.enable_button(self.convert_button)
+        self.show_error(f"음성 변환 오류:\\n{str(e)}")
 
     def play_audio(self):
         """음성 재생"""
@@ -397,20 +533,33 @@ class KoreanTTSGUI:
             self.show_info("오디오 재생 기능을 사용할 수 없습니다.")
             return
 
-        if not self.current_audio_file or not os.path.exists(self.current_audio_file):
+        if self._last_audio is None:
             self.show_warning("재생할 음성 파일이 없습니다.")
             return
 
         try:
-            pygame.mixer.music.load(self.current_audio_file)
-            pygame.mixer.music.play()
+            # 메모리 버퍼에서 바로 재생 (임시 WAV 파일 쓰기/다시 읽기 없음)
+            if AUDIO_BACKEND == "sounddevice":
+                pcm, sample_rate = self._last_audio
+                sd.stop()
+                sd.play(pcm, sample_rate)
+                self.update_status("🔊 재생 중...")
+                return
+
+            if self._sound is None:
+                buffer = io.BytesIO()
+                write_wav(buffer, *self._last_audio)
+                buffer.seek(0)
+                self._sound = pygame.mixer.Sound(file=buffer)
+            pygame.mixer.stop()
+            self._sound.play()
             self.update_status("🔊 재생 중...")
         except Exception as e:
             self.show_error(f"재생 오류:\\n{str(e)}")
 
     def save_audio(self):
         """음성 파일 저장"""
-        if not self.current_audio_file or not os.path.exists(self.current_audio_file):
+        if self._last_audio is None:
             self.show_warning("저장할 음성 파일이 없습니다.")
             return
 
@@ -422,17 +571,11 @@ class KoreanTTSGUI:
         )
 
         if file_path:
-            try:
-                import shutil
-                shutil.copy2(self.current_audio_file, file_path)
-                self.update_status(f"💾 저장 완료: {os.path.basename(file_path)}")
-                self.show_info(f"파일이 저장되었습니다:\\n{file_path}")
-            except Exception as e:
-                self.show_error(f"저장 오류:\\n{str(e)}")
+            asyncio.run_coroutine_threadsafe(self._asave(file_path, self._last_audio), self._loop)
 
     def save_with_model_name(self):
         """현재 모델명을 포함한 파일명으로 저장"""
-        if not self.current_audio_file or not os.path.exists(self.current_audio_file):
+        if self._last_audio is None:
             self.show_warning("저장할 음성 파일이 없습니다.")
             return
 
@@ -458,13 +601,20 @@ class KoreanTTSGUI:
         )
 
         if file_path:
-            try:
-                import shutil
-                shutil.copy2(self.current_audio_file, file_path)
-                self.update_status(f"💾 저장 완료: {os.path.basename(file_path)}")
-                self.show_info(f"파일이 저장되었습니다:\\n{file_path}")
-            except Exception as e:
-                self.show_error(f"저장 오류:\\n{str(e)}")
+            asyncio.run_coroutine_threadsafe(self._asave(file_path, self._last_audio), self._loop)
+
+    async def _asave(self, dst, audio):
+        """변환 결과를 WAV로 저장 (작업 스레드에서 실행 후 Tk 스레드에서 결과 표시)"""
+        try:
+            await asyncio.to_thread(write_wav, dst, *audio)
+        except Exception as e:
+            self.root.after(0, self.show_error, f"저장 오류:\\n{str(e)}")
+        else:
+            self.root.after(0, self._on_saved, dst)
+
+    def _on_saved(self, file_path):
+        self.update_status(f"💾 저장 완료: {os.path.basename(file_path)}")
+        self.show_info(f"파일이 저장되었습니다:\\n{file_path}")
 
     # 유틸리티 메서드
     def get_text_input(self):
@@ -503,11 +653,12 @@ class KoreanTTSGUI:
     def run(self):
         """GUI 실행"""
         self.root.mainloop()
+        self._pool.shutdown(wait=False, cancel_futures=True)
 
 def main():
     print("한국어 TTS GUI 시작...")
     print(f"Modern UI: {'Yes' if USE_MODERN_UI else 'No'}")
-    print(f"Audio Support: {'Yes' if AUDIO_AVAILABLE else 'No'}")
+    print(f"Audio Support: {AUDIO_BACKEND if AUDIO_AVAILABLE else 'No'}")
 
     # PyTorch 설치 확인
     try:
@@ -3,17 +3,23 @@ MeloTTS Engine for RealtimeTTS
 Custom engine integrating MeloTTS with RealtimeTTS framework
 """
 
+# Thread env must be set before numpy/torch are imported
+from utils.thread_config import configure_threads
+
+configure_threads()
+
 import os
 import sys
-import tempfile
 import warnings
+from functools import lru_cache
+
+warnings.filterwarnings("ignore")
+
 import numpy as np
-import pyaudio
+import torch
 from typing import Union
 from pathlib import Path
 
-warnings.filterwarnings("ignore")
-
 # Add MeloTTS to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'MeloTTS'))
 
@@ -26,6 +32,23 @@ except ImportError as e:
     raise ImportError("MeloTTS is required for this engine")
 
 
+# pyaudio.paInt16; kept as a literal so server-only hosts never load PortAudio
+PA_INT16 = 8
+
+
+@lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    """CUDA availability, probed once per process"""
+    return torch.cuda.is_available()
+
+
+WARMUP_TEXTS = {
+    'KR': "안녕하세요.",
+    'ZH': "你好。",
+    'JP': "こんにちは。",
+}
+
+
 class MeloVoice:
     def __init__(self, language: str, speaker_id: int = 0):
         self.language = language
@@ -37,6 +60,109 @@ class MeloVoice:
 
 
 class MeloEngine(BaseEngine):
+    # Loaded models shared across engine instances, keyed by (language, device)
+    _MODEL_CACHE: dict = {}
+
+    # Speakers per language (Korean/English variants ship one, Chinese may have more)
+    _VOICE_COUNTS: dict = {'KR': 1, 'EN': 1, 'EN_V2': 1, 'EN_NEWEST': 1, 'ZH': 10}
+    # MeloVoice lists built on first get_voices() call, keyed by language
+    _VOICE_CACHE: dict = {}
+
+    @classmethod
+    def _get_model(cls, language: str, device: str):
+        """
+        Return a cached TTS model, loading it on first use
+
+        Args:
+            language (str): Language code
+            device (str): Device to use
+
+        Returns:
+            TTS: Loaded MeloTTS model
+        """
+        key = (language, device)
+        model = cls._MODEL_CACHE.get(key)
+        if model is None:
+            model = TTS(language=language, device=device)
+            eager_infer = cls._compile_model(model, device)
+            if not cls._warmup_model(model, language) and eager_infer is not None:
+                # torch.compile is lazy, so compile errors only surface here; fall back to eager
+                print("torch.compile failed during warmup - falling back to eager infer")
+                model.model.infer = eager_infer
+                cls._warmup_model(model, language)
+            cls._MODEL_CACHE[key] = model
+        return model
+
+    @staticmethod
+    def _compile_model(model, device: str):
+        """
+        Wrap the MeloTTS inference path in torch.compile
+
+        Only done on CUDA, or on CPU when MELO_TORCH_COMPILE=1 is set
+        (no-op before torch 2.x).
+
+        Returns:
+            The original eager infer method if it was replaced, else None
+        """
+        on_cuda = device.startswith('cuda')
+        if not hasattr(torch, 'compile') or not (on_cuda or os.environ.get('MELO_TORCH_COMPILE') == '1'):
+            return None
+        eager_infer = model.model.infer
+        try:
+            # melo calls model.infer() rather than forward(), so compile that method;
+            # reduce-overhead uses CUDA graphs, so CPU gets the default mode
+            model.model.infer = torch.compile(
+                eager_infer, mode='reduce-overhead' if on_cuda else 'default', fullgraph=False
+            )
+        except Exception as e:
+            print(f"torch.compile failed (ignored): {e}")
+            return None
+        return eager_infer
+
+    @staticmethod
+    def _warmup_model(model, language: str) -> bool:
+        """
+        Synthesize a short phrase once so compile/autotune cost is paid at load time
+
+        Returns:
+            bool: True if the warmup synthesis succeeded
+        """
+        try:
+            with torch.inference_mode():
+                model.tts_to_file(
+                    text=WARMUP_TEXTS.get(language, "Hello."),
+                    speaker_id=0,
+                    output_path=None,
+                    speed=1.0,
+                    quiet=True
+                )
+        except Exception as e:
+            print(f"Warmup failed: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _resolve_device(device: str) -> str:
+        """
+        Resolve 'auto' to a concrete device instead of relying on MeloTTS's
+        own selection, and enable cuDNN autotuning for the HiFi-GAN convs
+
+        Args:
+            device (str): Device to use ('cpu', 'cuda', 'auto')
+
+        Returns:
+            str: 'cuda' or 'cpu' (or the explicit device passed in)
+        """
+        if device == 'auto':
+            device = 'cuda' if _cuda_available() else 'cpu'
+            if device == 'cpu':
+                # printed rather than warnings.warn: this module silences warnings globally
+                print("⚠ CUDA not available - MeloTTS falling back to CPU (synthesis will be much slower)")
+        if device.startswith('cuda'):
+            torch.backends.cudnn.benchmark = True
+            torch.set_float32_matmul_precision('high')
+        return device
+
     def __init__(self, language: str = 'KR', device: str = 'auto', speaker_id: int = 0):
         """
         Initialize MeloTTS engine for RealtimeTTS
@@ -47,13 +173,15 @@ class MeloEngine(BaseEngine):
             speaker_id (int): Speaker ID for voice
         """
         self.language = language
-        self.device = device
+        self.device = device = self._resolve_device(device)
         self.speaker_id = speaker_id
         self.tts_model = None
+        # Reusable int16 output buffer, grown to the longest piece seen so far
+        self._int16_scratch = np.empty(0, dtype=np.int16)
 
         # Initialize TTS model
         try:
-            self.tts_model = TTS(language=language, device=device)
+            self.tts_model = self._get_model(language, device)
             print(f"✓ MeloTTS model loaded: {language} on {device}")
         except Exception as e:
             print(f"✗ Failed to load MeloTTS model: {e}")
@@ -70,7 +198,8 @@ class MeloEngine(BaseEngine):
         Returns:
             tuple: (format, channels, sample_rate)
         """
-        return pyaudio.paInt16, 1, 24000  # MeloTTS default: 24kHz, mono, 16-bit
+        # Audio is streamed at the model's native rate (no resampling step)
+        return PA_INT16, 1, self.tts_model.hps.data.sampling_rate
 
     def synthesize(self, text: str) -> bool:
         """
@@ -89,78 +218,91 @@ class MeloEngine(BaseEngine):
             # Call parent method to clear stop event
             super().synthesize(text)
 
-            # Create temporary file for audio output
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
-
-            # Generate audio
-            self.tts_model.tts_to_file(
-                text=text,
-                speaker_id=self.speaker_id,
-                output_path=temp_path,
-                speed=1.0,
-                quiet=True
+            # Synthesize sentence by sentence and queue each piece as soon as it
+            # is ready, so playback starts after the first sentence, not the last
+            pieces = self.tts_model.split_sentences_into_pieces(
+                text, self.tts_model.language, quiet=True
             )
-
-            # Read audio file and convert to numpy array
-            audio_data = self._load_audio_file(temp_path)
-
-            # Clean up temp file
-            os.unlink(temp_path)
-
-            if audio_data is not None:
-                # Apply audio processing (trim silence, fade)
-                audio_data = self._trim_silence(audio_data)
-
-                # Convert to int16 format for streaming
-                audio_int16 = (audio_data * 32767).astype(np.int16)
-
-                # Split into chunks and put into queue
-                chunk_size = 1024  # Audio chunk size
-                for i in range(0, len(audio_int16), chunk_size):
-                    if self.stop_synthesis_event.is_set():
-                        break
-
-                    chunk = audio_int16[i:i + chunk_size]
-                    self.queue.put(chunk.tobytes())
-
-                # Signal end of synthesis
-                self.queue.put(None)
-                return True
+            last = len(pieces) - 1
+            for i, piece in enumerate(pieces):
+                if self.stop_synthesis_event.is_set():
+                    break
+
+                # Generate audio in memory (output_path=None returns the float32 array)
+                with torch.inference_mode():
+                    audio_data = self.tts_model.tts_to_file(
+                        text=piece,
+                        speaker_id=self.speaker_id,
+                        output_path=None,
+                        speed=1.0,
+                        quiet=True
+                    )
+                if audio_data is None:
+                    continue
+
+                # Trim only the utterance's outer edges; melo's inter-sentence pause stays
+                audio_data = self._trim_silence(audio_data, head=(i == 0), tail=(i == last))
+                self._put_audio(audio_data)
+
+            # Signal end of synthesis
+            self.queue.put(None)
+            return True
 
         except Exception as e:
             print(f"Synthesis error: {e}")
             self.queue.put(None)
             return False
 
-        return False
+    def _put_audio(self, audio_data: np.ndarray):
+        """
+        Convert float audio to int16 and queue it in fixed-size byte chunks
 
-    def _load_audio_file(self, file_path: str) -> np.ndarray:
+        Args:
+            audio_data (np.ndarray): Float audio in [-1, 1]
+        """
+        # Convert to int16 format for streaming: scale/clip in place, then cast
+        # into the preallocated scratch buffer (no full-size temporaries)
+        n = len(audio_data)
+        if self._int16_scratch.size < n:
+            self._int16_scratch = np.empty(n, dtype=np.int16)
+        audio_int16 = self._int16_scratch[:n]
+        np.multiply(audio_data, 32767.0, out=audio_data)
+        np.clip(audio_data, -32768, 32767, out=audio_data)
+        np.copyto(audio_int16, audio_data, casting='unsafe')
+
+        # Split into chunks and put into queue: serialize once, then
+        # slice byte offsets instead of tobytes() per ndarray slice
+        # (bytes() copies, so the scratch buffer can be reused by the next piece)
+        chunk_bytes = 1024 * 2  # 1024 paInt16 samples
+        raw = memoryview(audio_int16).cast('B')
+        for off in range(0, len(raw), chunk_bytes):
+            if self.stop_synthesis_event.is_set():
+                break
+
+            self.queue.put(bytes(raw[off:off + chunk_bytes]))
+
+    @staticmethod
+    def _trim_silence(audio: np.ndarray, threshold: float = 0.01,
+                      head: bool = True, tail: bool = True) -> np.ndarray:
         """
-        Load audio file and return as numpy array
+        Trim leading/trailing silence below an amplitude threshold
 
         Args:
-            file_path (str): Path to audio file
+            audio (np.ndarray): Float audio in [-1, 1]
+            threshold (float): Absolute amplitude treated as silence
+            head (bool): Trim leading silence
+            tail (bool): Trim trailing silence
 
         Returns:
-            np.ndarray: Audio data as float32 array
+            np.ndarray: View of audio without the silent head and/or tail
         """
-        try:
-            import librosa
-            audio_data, _ = librosa.load(file_path, sr=24000, mono=True)
-            return audio_data.astype(np.float32)
-        except ImportError:
-            # Fallback to wave module
-            import wave
-            with wave.open(file_path, 'rb') as wav_file:
-                frames = wav_file.readframes(-1)
-                audio_data = np.frombuffer(frames, dtype=np.int16)
-                # Convert to float32 and normalize
-                audio_data = audio_data.astype(np.float32) / 32768.0
-                return audio_data
-        except Exception as e:
-            print(f"Error loading audio file: {e}")
-            return None
+        # One vectorized pass for the mask, argmax finds the first True from each end
+        mask = np.abs(audio) > threshold
+        if not mask.any():
+            return audio[:0]
+        start = mask.argmax() if head else 0
+        end = len(audio) - mask[::-1].argmax() if tail else len(audio)
+        return audio[start:end]
 
     def get_voices(self):
         """
@@ -169,20 +311,12 @@ class MeloEngine(BaseEngine):
         Returns:
             list: List of available MeloVoice objects
         """
-        # For MeloTTS, voices are typically differentiated by speaker_id
-        # The exact number depends on the model
-        voices = []
-
-        # Most MeloTTS models have at least 1 speaker (speaker_id=0)
-        if self.language == 'KR':
-            voices = [MeloVoice(self.language, i) for i in range(1)]  # Korean usually has 1 speaker
-        elif self.language in ['EN', 'EN_V2', 'EN_NEWEST']:
-            voices = [MeloVoice(self.language, i) for i in range(1)]  # English variants
-        elif self.language == 'ZH':
-            voices = [MeloVoice(self.language, i) for i in range(10)]  # Chinese may have more speakers
-        else:
-            voices = [MeloVoice(self.language, 0)]  # Default single speaker
-
+        # For MeloTTS, voices are differentiated by speaker_id; lists are built
+        # once per language and shared
+        voices = self._VOICE_CACHE.get(self.language)
+        if voices is None:
+            count = self._VOICE_COUNTS.get(self.language, 1)
+            voices = self._VOICE_CACHE[self.language] = [MeloVoice(self.language, i) for i in range(count)]
         return voices
 
     def set_voice(self, voice: Union[str, MeloVoice]):
@@ -192,6 +326,8 @@ class MeloEngine(BaseEngine):
         Args:
             voice (Union[str, MeloVoice]): Voice to set
         """
+        previous_language = self.language
+
         if isinstance(voice, str):
             # Parse voice string (e.g., "KR_speaker_0")
             if "_speaker_" in voice:
@@ -207,9 +343,11 @@ class MeloEngine(BaseEngine):
             self.language = voice.language
             self.speaker_id = voice.speaker_id
 
-        # Reinitialize TTS model if language changed
+        # Swap TTS model only if language changed
+        if self.language == previous_language and self.tts_model is not None:
+            return
         try:
-            self.tts_model = TTS(language=self.language, device=self.device)
+            self.tts_model = self._get_model(self.language, self.device)
         except Exception as e:
             print(f"Error changing voice: {e}")
 
@@ -223,11 +361,11 @@ class MeloEngine(BaseEngine):
         if 'speaker_id' in voice_parameters:
             self.speaker_id = voice_parameters['speaker_id']
 
-        if 'language' in voice_parameters:
+        if 'language' in voice_parameters and voice_parameters['language'] != self.language:
             self.language = voice_parameters['language']
-            # Reinitialize model with new language
+            # Swap to the (cached) model for the new language
             try:
-                self.tts_model = TTS(language=self.language, device=self.device)
+                self.tts_model = self._get_model(self.language, self.device)
             except Exception as e:
                 print(f"Error changing language: {e}")
 
@@ -236,6 +374,6 @@ class MeloEngine(BaseEngine):
         Shutdown the engine
         """
         if self.tts_model:
-            del self.tts_model
+            # Drop this engine's reference; the model stays in _MODEL_CACHE for reuse
             self.tts_model = None
         super().shutdown()
\ No newline at end of file
@@ -157,7 +157,9 @@ class VoiceChatApp {
 
             this.websocket.onmessage = (event) => {
                 const data = JSON.parse(event.data);
-                this.handleWebSocketMessage(data);
+                // 서버가 여러 메시지를 한 프레임으로 묶어 보낸 경우 (type: "batch") 하나씩 처리
+                const items = data.type === 'batch' ? data.items : [data];
+                items.forEach((item) => this.handleWebSocketMessage(item));
             };
 
             this.websocket.onclose = () => {
@@ -403,19 +405,15 @@ class VoiceChatApp {
             // WebM 오디오 블롭 생성
             const audioBlob = new Blob(this.audioChunks, { type: 'audio/webm;codecs=opus' });
 
-            // WebM 데이터를 Base64로 인코딩
-            const arrayBuffer = await audioBlob.arrayBuffer();
-            const base64Audio = this.arrayBufferToBase64(arrayBuffer);
-
-            // WebSocket으로 WebM 데이터 전송
+            // WebSocket으로 WebM 데이터 전송 (헤더 JSON 다음 바이너리 프레임, Base64 인코딩 없음)
             if (this.websocket && this.isConnected) {
-                const message = {
-                    type: 'audio',
-                    data: base64Audio,
+                const header = {
+                    type: 'audio_header',
                     timestamp: new Date().toISOString()
                 };
 
-                this.websocket.send(JSON.stringify(message));
+                this.websocket.send(JSON.stringify(header));
+                this.websocket.send(audioBlob);
                 console.log('📤 WebM 오디오 데이터 전송:', audioBlob.size, 'bytes');
             }
 
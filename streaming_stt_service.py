@@ -4,15 +4,24 @@
 스트리밍 음성 인식을 위한 고성능 서비스
 """
 
+# numpy/ctranslate2 import 전에 스레드 환경 변수 설정
+from utils.thread_config import configure_threads
+
+CPU_THREADS = configure_threads()
+
 import asyncio
+import io
 import time
-import tempfile
-import os
-from typing import Optional, Dict, Any, AsyncGenerator
+import weakref
+from typing import Optional, Dict, Any, AsyncGenerator, List
 from dataclasses import dataclass
+import numpy as np
 from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
 import logging
 
+from utils.model_slots import model_slots
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,7 +29,7 @@ logger = logging.getLogger(__name__)
 @dataclass
 class AudioChunk:
     """WebM 오디오 청크 데이터 클래스"""
-    data: str  # WebM 파일 경로
+    data: bytes  # WebM 바이트 (전사 시 메모리에서 바로 디코딩)
     sample_rate: int
     timestamp: float
     is_final: bool = False
@@ -36,43 +45,37 @@ class TranscriptionResult:
 
 # VAD 클래스 제거 - Faster Whisper 내장 VAD 사용
 
-class StreamingSTTService:
-    """실시간 STT 서비스 클래스"""
+class SharedSTTModel:
+    """여러 스트리밍 세션이 공유하는 Faster Whisper 모델
+
+    모델 가중치는 프로세스에 하나만 올리고, 세션별 큐/기록은 StreamingSession이 가진다.
+    """
 
     def __init__(self,
                  model_size: str = "base",
                  device: str = "auto",
-                 compute_type: str = "int8"):
+                 compute_type: str = "auto"):
         """
-        STT 서비스 초기화
+        공유 STT 모델 초기화
 
         Args:
             model_size: Whisper 모델 크기 ("tiny", "base", "small", "medium", "large-v3")
             device: 디바이스 ("cpu", "cuda", "auto")
-            compute_type: 계산 타입 ("int8", "float16", "float32")
+            compute_type: 계산 타입 ("auto", "int8", "int8_float16", "float16", "float32")
         """
         self.model_size = model_size
         self.device = self._get_device(device)
-        self.compute_type = compute_type
+        self.compute_type = self._get_compute_type(compute_type)
 
         # Faster Whisper 모델 로드
         self.model: Optional[WhisperModel] = None
-
-        # 스트리밍 관련 설정
-        self.chunk_duration = 1.0  # 초
-        self.overlap_duration = 0.3  # 초 (청크 간 겹침)
         self.sample_rate = 16000
-        self.min_chunk_length = 0.5  # 최소 청크 길이 (초)
 
         # 상태 관리
         self.is_initialized = False
-        self.transcription_history = []
-
-        # 비동기 처리를 위한 큐
-        self.audio_queue = asyncio.Queue()
-        self.result_queue = asyncio.Queue()
+        self._sessions = weakref.WeakSet()  # 통계용 활성 세션 (연결이 끝나면 자동으로 빠짐)
 
-        logger.info(f"StreamingSTT 초기화: {model_size} on {self.device}")
+        logger.info(f"StreamingSTT 초기화: {model_size} on {self.device} ({self.compute_type})")
 
     def _get_device(self, device: str) -> str:
         """디바이스 자동 감지"""
@@ -84,6 +87,24 @@ class StreamingSTTService:
                 return "cpu"
         return device
 
+    def _get_compute_type(self, compute_type: str) -> str:
+        """계산 타입 자동 선택
+
+        CUDA에서 순수 int8은 오히려 느리므로, 텐서 코어가 있는 GPU
+        (compute capability 7.0+)에서는 int8 가중치 + FP16 연산(int8_float16)을,
+        그 외에는 int8을 쓴다.
+        """
+        if compute_type != "auto":
+            return compute_type
+        if self.device == "cuda":
+            try:
+                import torch
+                if torch.cuda.get_device_capability(0)[0] >= 7:
+                    return "int8_float16"
+            except Exception:
+                pass
+        return "int8"
+
     async def initialize(self):
         """모델 비동기 초기화"""
         if self.is_initialized:
@@ -94,7 +115,10 @@ class StreamingSTTService:
             self.model = WhisperModel(
                 self.model_size,
                 device=self.device,
-                compute_type=self.compute_type
+                device_index=0,
+                compute_type=self.compute_type,
+                cpu_threads=CPU_THREADS,
+                num_workers=1  # 스트리밍은 단일 스트림 - 워커 간 경합 방지
             )
             self.is_initialized = True
             logger.info("✅ Faster Whisper 모델 로드 완료")
@@ -103,82 +127,48 @@ class StreamingSTTService:
             logger.error(f"❌ 모델 로드 실패: {e}")
             raise
 
-    def add_audio_chunk(self, audio_data: bytes, timestamp: float = None) -> None:
+    async def transcribe_chunk(self, audio_chunk: AudioChunk) -> Optional[TranscriptionResult]:
         """
-        WebM 오디오 청크 추가 (동기 메소드)
+        단일 WebM 오디오 청크 전사
 
         Args:
-            audio_data: WebM 오디오 바이트 데이터
-            timestamp: 타임스탬프
-        """
-        if timestamp is None:
-            timestamp = time.time()
+            audio_chunk: WebM 오디오 청크
 
-        try:
-            # WebM 데이터 크기 검증
-            if len(audio_data) < 100:  # 너무 작은 청크는 무시
-                logger.warning(f"너무 작은 WebM 청크 무시: {len(audio_data)} bytes")
-                return
-
-            # WebM 데이터를 임시 파일로 저장하여 Faster Whisper에 직접 전달
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-
-            # WebM 파일 유효성 간단 검증
-            if not self._is_valid_webm_file(temp_file_path):
-                logger.warning("유효하지 않은 WebM 파일 - 청크 무시")
-                try:
-                    os.unlink(temp_file_path)
-                except:
-                    pass
-                return
-
-            chunk = AudioChunk(
-                data=temp_file_path,  # 파일 경로를 저장
-                sample_rate=self.sample_rate,
-                timestamp=timestamp
-            )
-
-            # 비동기 큐에 추가 (논블로킹)
-            try:
-                self.audio_queue.put_nowait(chunk)
-            except asyncio.QueueFull:
-                logger.warning("오디오 큐가 가득참 - 청크 드롭")
-
-        except Exception as e:
-            logger.error(f"WebM 오디오 청크 처리 오류: {e}")
-
-    def _is_valid_webm_file(self, file_path: str) -> bool:
-        """WebM 파일 유효성 간단 검증"""
-        try:
-            with open(file_path, 'rb') as f:
-                header = f.read(32)
-                # WebM/Matroska 매직 바이트 확인
-                return b'\x1a\x45\xdf\xa3' in header  # EBML header
-        except Exception:
-            return False
+        Returns:
+            TranscriptionResult 또는 None
+        """
+        results = await self.transcribe_batch([audio_chunk])
+        return results[0]
 
-    async def transcribe_chunk(self, audio_chunk: AudioChunk) -> Optional[TranscriptionResult]:
+    async def transcribe_batch(self, audio_chunks: List[AudioChunk]) -> List[Optional[TranscriptionResult]]:
         """
-        단일 WebM 오디오 청크 전사
+        여러 WebM 오디오 청크를 한 번의 작업 스레드 호출로 전사 (이벤트 루프 블로킹 방지)
 
         Args:
-            audio_chunk: WebM 오디오 청크 (파일 경로 포함)
+            audio_chunks: WebM 오디오 청크 목록
 
         Returns:
-            TranscriptionResult 또는 None
+            청크별 TranscriptionResult 또는 None 목록
         """
         if not self.is_initialized or not self.model:
             await self.initialize()
 
+        # 웹 서버 STT/TTS와 같은 추론 슬롯을 사용 (프로세스 전체 동시 추론 수 제한)
+        async with model_slots():
+            return await asyncio.to_thread(
+                lambda: [self._transcribe_sync(chunk) for chunk in audio_chunks]
+            )
+
+    def _transcribe_sync(self, audio_chunk: AudioChunk) -> Optional[TranscriptionResult]:
+        """단일 WebM 오디오 청크 전사 (작업 스레드에서 실행)"""
         start_time = time.time()
-        webm_file_path = audio_chunk.data
 
         try:
-            # Faster Whisper로 WebM 파일 직접 전사
+            # WebM → 16kHz mono float32 PCM (PyAV로 프로세스 내 메모리 디코딩)
+            audio = decode_audio(io.BytesIO(audio_chunk.data), sampling_rate=self.sample_rate)
+
             segments, info = self.model.transcribe(
-                webm_file_path,
+                audio,
                 language="ko",
                 beam_size=1,  # 빠른 처리를 위해 beam_size 감소
                 word_timestamps=False,
@@ -188,27 +178,20 @@ class StreamingSTTService:
 
             # 결과 합치기
             text_parts = []
-            total_confidence = 0
-            segment_count = 0
+            logprobs = []
 
             for segment in segments:
                 text_parts.append(segment.text)
-                # avg_logprob를 confidence로 변환 (-1~0 범위를 0~1로)
-                confidence = max(0, min(1, (segment.avg_logprob + 1)))
-                total_confidence += confidence
-                segment_count += 1
+                logprobs.append(segment.avg_logprob)
 
             text = "".join(text_parts).strip()
-            avg_confidence = total_confidence / max(segment_count, 1)
+            # avg_logprob를 confidence로 변환 (-1~0 범위를 0~1로) 후 평균
+            avg_confidence = (
+                float(np.clip(np.asarray(logprobs, dtype=np.float32) + 1, 0, 1).mean())
+                if logprobs else 0.0
+            )
             processing_time = time.time() - start_time
 
-            # 임시 WebM 파일 삭제
-            try:
-                import os
-                os.unlink(webm_file_path)
-            except Exception as cleanup_error:
-                logger.warning(f"임시 파일 삭제 실패: {cleanup_error}")
-
             if text:
                 result = TranscriptionResult(
                     text=text,
@@ -225,15 +208,127 @@ class StreamingSTTService:
 
         except Exception as e:
             logger.error(f"WebM 전사 오류: {e}")
-            # 오류 발생시에도 임시 파일 정리
-            try:
-                import os
-                os.unlink(webm_file_path)
-            except:
-                pass
 
         return None
 
+    def get_stats(self) -> Dict[str, Any]:
+        """모델 통계 반환 (queue_size는 활성 세션 전체의 밀린 청크 수)"""
+        return {
+            "model_size": self.model_size,
+            "device": self.device,
+            "compute_type": self.compute_type,
+            "is_initialized": self.is_initialized,
+            "sample_rate": self.sample_rate,
+            "chunk_duration": StreamingSession.chunk_duration,
+            "queue_size": sum(session.audio_queue.qsize() for session in list(self._sessions))
+        }
+
+    def create_session(self) -> "StreamingSession":
+        """이 모델을 공유하는 새 스트리밍 세션 생성"""
+        session = StreamingSession(self)
+        self._sessions.add(session)
+        return session
+
+    async def cleanup(self):
+        """리소스 정리"""
+        logger.info("STT 모델 정리 중...")
+        if self.model:
+            del self.model
+        self.model = None
+        self.is_initialized = False
+        logger.info("✅ STT 모델 정리 완료")
+
+
+class StreamingSession:
+    """세션(연결)별 스트리밍 STT 상태 - 오디오 큐와 전사 기록만 보유 (모델은 공유)"""
+
+    chunk_duration = 1.0  # 초 (모든 세션 공통 - 서비스 통계에도 노출)
+
+    def __init__(self, shared: SharedSTTModel):
+        """
+        스트리밍 세션 초기화
+
+        Args:
+            shared: 전사에 사용할 공유 STT 모델
+        """
+        self.shared = shared
+
+        # 스트리밍 관련 설정
+        self.overlap_duration = 0.3  # 초 (청크 간 겹침)
+        self.sample_rate = shared.sample_rate
+        self.min_chunk_length = 0.5  # 최소 청크 길이 (초)
+        self.max_batch = 4  # 한 번에 작업 스레드로 넘길 최대 청크 수
+        self.max_queue_size = 8  # 밀린 청크 상한 (초과 시 가장 오래된 청크부터 버림)
+
+        # 상태 관리
+        self.transcription_history = []
+
+        # 비동기 처리를 위한 큐
+        self.audio_queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.result_queue = asyncio.Queue()
+
+    async def initialize(self):
+        """공유 모델 초기화 (이미 로드됐으면 즉시 반환)"""
+        await self.shared.initialize()
+
+    def add_audio_chunk(self, audio_data: bytes, timestamp: float = None) -> None:
+        """
+        WebM 오디오 청크 추가 (동기 메소드)
+
+        Args:
+            audio_data: WebM 오디오 바이트 데이터
+            timestamp: 타임스탬프
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        try:
+            # WebM 데이터 크기 검증
+            if len(audio_data) < 100:  # 너무 작은 청크는 무시
+                logger.warning(f"너무 작은 WebM 청크 무시: {len(audio_data)} bytes")
+                return
+
+            # WebM 데이터 유효성 간단 검증
+            if not self._is_valid_webm(audio_data):
+                logger.warning("유효하지 않은 WebM 데이터 - 청크 무시")
+                return
+
+            chunk = AudioChunk(
+                data=audio_data,  # 임시 파일 없이 바이트 그대로 보관
+                sample_rate=self.sample_rate,
+                timestamp=timestamp
+            )
+
+            # 비동기 큐에 추가 (논블로킹)
+            try:
+                self.audio_queue.put_nowait(chunk)
+            except asyncio.QueueFull:
+                # 스트리밍은 최신 음성이 중요하므로 가장 오래된 청크를 버리고 새 청크를 넣음
+                logger.warning("오디오 큐가 가득참 - 가장 오래된 청크 드롭")
+                try:
+                    self.audio_queue.get_nowait()
+                    self.audio_queue.put_nowait(chunk)
+                except (asyncio.QueueEmpty, asyncio.QueueFull):
+                    pass
+
+        except Exception as e:
+            logger.error(f"WebM 오디오 청크 처리 오류: {e}")
+
+    def _is_valid_webm(self, audio_data: bytes) -> bool:
+        """WebM 데이터 유효성 간단 검증"""
+        # WebM/Matroska 매직 바이트 확인
+        return b'\x1a\x45\xdf\xa3' in audio_data[:32]  # EBML header
+
+    def _collect_batch(self, first_chunk: AudioChunk) -> List[AudioChunk]:
+        """이미 대기 중인 청크를 max_batch개까지 함께 수집 (추가 대기 없음)"""
+        batch = [first_chunk]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.audio_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
     async def process_stream(self) -> AsyncGenerator[TranscriptionResult, None]:
         """
         오디오 스트림 처리 및 결과 생성
@@ -241,8 +336,8 @@ class StreamingSTTService:
         Yields:
             TranscriptionResult: 전사 결과
         """
-        if not self.is_initialized:
-            await self.initialize()
+        if not self.shared.is_initialized:
+            await self.shared.initialize()
 
         logger.info("🎤 스트리밍 STT 시작")
 
@@ -255,10 +350,11 @@ class StreamingSTTService:
                         timeout=5.0
                     )
 
-                    # 전사 처리
-                    result = await self.transcribe_chunk(chunk)
-                    if result:
-                        yield result
+                    # 전사 처리 (밀려 있는 청크는 한 번에 처리)
+                    results = await self.shared.transcribe_batch(self._collect_batch(chunk))
+                    for result in results:
+                        if result:
+                            yield result
 
                 except asyncio.TimeoutError:
                     # 타임아웃은 정상 동작 (새 청크 대기)
@@ -273,29 +369,18 @@ class StreamingSTTService:
             logger.error(f"스트리밍 처리 치명적 오류: {e}")
 
     def get_stats(self) -> Dict[str, Any]:
-        """서비스 통계 반환"""
+        """세션 통계 반환 (공유 모델 통계 포함)"""
         return {
-            "model_size": self.model_size,
-            "device": self.device,
-            "compute_type": self.compute_type,
-            "is_initialized": self.is_initialized,
-            "sample_rate": self.sample_rate,
-            "chunk_duration": self.chunk_duration,
-            "queue_size": self.audio_queue.qsize() if hasattr(self.audio_queue, 'qsize') else 0
+            **self.shared.get_stats(),
+            "queue_size": self.audio_queue.qsize()
         }
 
-    async def cleanup(self):
-        """리소스 정리"""
-        logger.info("STT 서비스 정리 중...")
-        if self.model:
-            del self.model
-        self.model = None
-        self.is_initialized = False
-        logger.info("✅ STT 서비스 정리 완료")
-
-# 전역 STT 서비스 인스턴스
-streaming_stt_service = StreamingSTTService(
+# 전역 공유 STT 모델 (프로세스당 한 번만 로드)
+stt_model = SharedSTTModel(
     model_size="base",  # base 모델로 시작 (속도와 정확도 균형)
     device="auto",
-    compute_type="int8"  # 메모리 사용량 최적화
-)
\ No newline at end of file
+    compute_type="auto"  # GPU: int8_float16, CPU: int8
+)
+
+# 기본 세션 (기존 단일 인스턴스 API 호환용) - 연결별로는 stt_model.create_session() 사용
+streaming_stt_service = stt_model.create_session()
@@ -3,9 +3,81 @@
 데모 페이지 기능 테스트
 """
 
+import asyncio
+import aiohttp
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# 모든 요청이 같은 origin이므로 세션 하나로 keep-alive 연결 재사용
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# 같은 (텍스트, 언어, 속도, 모델 상태) 요청의 audio_url 캐시 - 재실행 시 합성 생략
+DEMO_CACHE_PATH = Path.home() / ".cache" / "plobin_tts" / "demo_cache.json"
+
+def _load_demo_cache():
+    """TTS 응답 캐시 읽기 (없거나 손상됐으면 빈 캐시)"""
+    try:
+        with open(DEMO_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_demo_cache(cache):
+    """TTS 응답 캐시 저장"""
+    try:
+        DEMO_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(DEMO_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"   (캐시 저장 실패: {e})")
+
+def _models_status_key():
+    """모델 상태 해시 (모델이 바뀌면 캐시 키도 바뀜)"""
+    try:
+        status = SESSION.get("http://localhost:6001/api/models/status", timeout=10).json()
+    except (requests.RequestException, ValueError):
+        return ""
+    return hashlib.sha1(json.dumps(status, sort_keys=True).encode()).hexdigest()
+
+def _request_tts(payload, cache, model_key):
+    """캐시된 오디오가 아직 서빙되면 재사용, 아니면 /api/tts 호출 → (상태 코드, 응답, 캐시 사용 여부)"""
+    key = hashlib.sha1(json.dumps({**payload, "model": model_key}, sort_keys=True).encode()).hexdigest()
+
+    audio_url = cache.get(key)
+    if audio_url:
+        try:
+            if SESSION.head(f"http://localhost:6001{audio_url}", timeout=5).status_code == 200:
+                return 200, {"success": True, "audio_url": audio_url}, True
+        except requests.RequestException:
+            pass
+
+    response = SESSION.post("http://localhost:6001/api/tts", json=payload, timeout=15)
+    data = response.json() if response.status_code == 200 else None
+    if data and data.get('success') and data.get('audio_url'):
+        cache[key] = data['audio_url']
+    return response.status_code, data, False
+
+async def _probe_static(paths):
+    """정적 파일들을 하나의 keep-alive 세션에서 동시에 요청 (경로 순서대로 결과 반환)"""
+    async def check(session, file_path):
+        try:
+            async with session.get(f"http://localhost:6001{file_path}") as response:
+                if response.status == 200:
+                    return f"✅ {file_path}"
+                return f"❌ {file_path}: {response.status}"
+        except Exception as e:
+            return f"❌ {file_path}: {e}"
+
+    connector = aiohttp.TCPConnector(limit_per_host=4)
+    timeout = aiohttp.ClientTimeout(total=5)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(*(check(session, path) for path in paths))
 
 def test_demo_functionality():
     """데모 페이지 기능 테스트"""
@@ -15,7 +87,7 @@ def test_demo_functionality():
     # 1. 데모 페이지 접근 테스트
     print("\n1️⃣  데모 페이지 접근...")
     try:
-        response = requests.get("http://localhost:6001/static/demo.html", timeout=10)
+        response = SESSION.get("http://localhost:6001/static/demo.html", timeout=10)
         if response.status_code == 200:
             print("✅ 데모 페이지 접근 성공")
             content = response.text
@@ -48,27 +120,35 @@ def test_demo_functionality():
             ("일본어", "JP", "こんにちは！デモテストです。")
         ]
 
-        for lang_name, lang_code, text in test_texts:
-            tts_data = {
-                "text": text,
-                "language": lang_code,
-                "speed": 1.0
+        cache = _load_demo_cache()
+        model_key = _models_status_key()
+
+        # 서버가 언어별 모델을 병렬로 서빙하므로 세 요청을 동시에 전송
+        with ThreadPoolExecutor(max_workers=len(test_texts)) as executor:
+            futures = {
+                executor.submit(
+                    _request_tts,
+                    {"text": text, "language": lang_code, "speed": 1.0},
+                    cache,
+                    model_key
+                ): lang_name
+                for lang_name, lang_code, text in test_texts
             }
 
-            response = requests.post(
-                "http://localhost:6001/api/tts",
-                json=tts_data,
-                timeout=15
-            )
+            for future in as_completed(futures):
+                lang_name = futures[future]
+                status_code, data, cached = future.result()
 
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success'):
-                    print(f"   - {lang_name} TTS: ✅ ({data.get('audio_url', '').split('/')[-1]})")
+                if status_code == 200:
+                    if data.get('success'):
+                        note = ", 캐시" if cached else ""
+                        print(f"   - {lang_name} TTS: ✅ ({data.get('audio_url', '').split('/')[-1]}{note})")
+                    else:
+                        print(f"   - {lang_name} TTS: ❌ {data.get('error')}")
                 else:
-                    print(f"   - {lang_name} TTS: ❌ {data.get('error')}")
-            else:
-                print(f"   - {lang_name} TTS: ❌ HTTP {response.status_code}")
+                    print(f"   - {lang_name} TTS: ❌ HTTP {status_code}")
+
+        _save_demo_cache(cache)
 
     except Exception as e:
         print(f"❌ TTS API 테스트 실패: {e}")
@@ -76,7 +156,7 @@ def test_demo_functionality():
     # 3. 언어 선택 API 테스트
     print("\n3️⃣  언어 선택 기능...")
     try:
-        response = requests.get("http://localhost:6001/api/languages", timeout=10)
+        response = SESSION.get("http://localhost:6001/api/languages", timeout=10)
         if response.status_code == 200:
             data = response.json()
             languages = data.get('languages', [])
@@ -99,7 +179,7 @@ def test_demo_functionality():
     # 4. WebSocket 정보 확인
     print("\n4️⃣  WebSocket 엔드포인트...")
     try:
-        response = requests.get("http://localhost:6001/api/websocket/info", timeout=10)
+        response = SESSION.get("http://localhost:6001/api/websocket/info", timeout=10)
         if response.status_code == 200:
             data = response.json()
             endpoints = data.get('endpoints', [])
@@ -121,15 +201,8 @@ def test_demo_functionality():
         "/static/js/voice-chat.js"
     ]
 
-    for file_path in static_files:
-        try:
-            response = requests.get(f"http://localhost:6001{file_path}", timeout=5)
-            if response.status_code == 200:
-                print(f"✅ {file_path}")
-            else:
-                print(f"❌ {file_path}: {response.status_code}")
-        except Exception as e:
-            print(f"❌ {file_path}: {e}")
+    for line in asyncio.run(_probe_static(static_files)):
+        print(line)
 
     print("\n" + "=" * 40)
     print("🎯 데모 테스트 완료!")
@@ -147,4 +220,5 @@ def test_demo_functionality():
     print("   🧪 개별 기능 테스트 버튼")
 
 if __name__ == "__main__":
-    test_demo_functionality()
\ No newline at end of file
+    with SESSION:
+        test_demo_functionality()
\ No newline at end of file
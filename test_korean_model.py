@@ -4,15 +4,23 @@ Korean TTS Model Test
 간단하게 한국어 TTS 모델 테스트
 """
 
+import importlib.util
 import os
 import sys
 import warnings
+from functools import lru_cache
 
 warnings.filterwarnings("ignore")
 
 # MeloTTS 경로 추가
 sys.path.append('./MeloTTS')
 
+@lru_cache(maxsize=4)
+def _load_model(language):
+    """언어별 TTS 모델을 한 번만 로드 (같은 프로세스에서 재호출 시 재사용)"""
+    from melo.api import TTS
+    return TTS(language=language, device='cpu')
+
 def test_korean_tts():
     """한국어 TTS 테스트"""
     print("한국어 TTS 모델 테스트 시작")
@@ -20,10 +28,10 @@ def test_korean_tts():
 
     try:
         print("1. MeloTTS 라이브러리 import 중...")
-        from melo.api import TTS
+        import melo.api  # noqa: F401 - import 오류를 로드 단계와 구분해 보고
 
         print("2. 한국어 모델 로드 중...")
-        model = TTS(language='KR', device='cpu')
+        model = _load_model('KR')
         print("✅ 모델 로드 성공!")
 
         print("3. 테스트 텍스트 음성 변환 중...")
@@ -70,15 +78,20 @@ def check_dependencies():
         'g2pkk',
         'jamo',
         'pykakasi',
-        'protobuf',
+        'google.protobuf',
         'huggingface_hub'
     ]
 
+    # 모듈을 실제로 import하지 않고 설치 여부만 확인 (torch 등의 초기화 비용 회피)
     for dep in dependencies:
         try:
-            __import__(dep)
+            installed = importlib.util.find_spec(dep) is not None
+        except ModuleNotFoundError:  # 상위 패키지가 없는 경우 (google.protobuf)
+            installed = False
+
+        if installed:
             print(f"✅ {dep}")
-        except ImportError:
+        else:
             print(f"❌ {dep} - 설치 필요")
 
     print()
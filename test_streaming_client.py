@@ -6,8 +6,24 @@ WebSocket TTS 스트리밍 테스트 클라이언트
 import asyncio
 import websockets
 import json
-import wave
-import io
+import numpy as np
+import soundfile as sf
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# 오디오는 바이너리 PCM 프레임이라 permessage-deflate는 CPU만 소모하므로 끔
+CONNECT_OPTIONS = {
+    "compression": None,
+    "max_size": 2 ** 24,
+    "max_queue": 64,
+}
+
+# 스트림 전체 수신 제한 시간 (메시지마다 타이머를 걸지 않고 한 번만 적용)
+RECEIVE_TIMEOUT = 30.0
 
 async def test_streaming_tts():
     """
@@ -16,7 +32,7 @@ async def test_streaming_tts():
     uri = "ws://localhost:6001/ws/tts"
 
     try:
-        async with websockets.connect(uri) as websocket:
+        async with websockets.connect(uri, **CONNECT_OPTIONS) as websocket:
             print("Connected to TTS streaming service")
 
             # 연결 확인 메시지 받기
@@ -29,39 +45,46 @@ async def test_streaming_tts():
             print(f"Sending text: {test_text}")
             await websocket.send(test_text)
 
-            # 오디오 데이터 수집
-            audio_chunks = []
-            audio_started = False
-
-            while True:
-                try:
-                    response = await asyncio.wait_for(websocket.recv(), timeout=10.0)
-
-                    if isinstance(response, str):
-                        print(f"Server message: {response}")
-
-                        if response == "|AUDIO_START|":
-                            audio_started = True
-                            print("Audio streaming started")
-                        elif response == "|AUDIO_END|":
-                            print("Audio streaming ended")
-                            break
-                    elif isinstance(response, bytes) and audio_started:
-                        # 오디오 청크 데이터
-                        audio_chunks.append(response)
-                        print(f"Received audio chunk: {len(response)} bytes")
-
-                except asyncio.TimeoutError:
-                    print("Timeout waiting for response")
-                    break
-                except Exception as e:
-                    print(f"Error: {e}")
-                    break
+            # 오디오 데이터 수집 (청크 리스트 대신 하나의 버퍼에 이어붙임)
+            audio_buf = bytearray()
+            chunk_count = 0
+
+            async def receive_audio():
+                nonlocal chunk_count
+                audio_started = False
+
+                while True:
+                    try:
+                        response = await websocket.recv()
+
+                        if isinstance(response, str):
+                            print(f"Server message: {response}")
+
+                            if response == "|AUDIO_START|":
+                                audio_started = True
+                                print("Audio streaming started")
+                            elif response == "|AUDIO_END|":
+                                print("Audio streaming ended")
+                                break
+                        elif isinstance(response, bytes) and audio_started:
+                            # 오디오 청크 데이터
+                            audio_buf.extend(response)
+                            chunk_count += 1
+                            print(f"Received audio chunk: {len(response)} bytes")
+
+                    except Exception as e:
+                        print(f"Error: {e}")
+                        break
+
+            try:
+                await asyncio.wait_for(receive_audio(), timeout=RECEIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                print("Timeout waiting for response")
 
             # 오디오 데이터를 파일로 저장
-            if audio_chunks:
-                print(f"Total audio chunks received: {len(audio_chunks)}")
-                save_audio_chunks(audio_chunks, "test_output.wav")
+            if audio_buf:
+                print(f"Total audio chunks received: {chunk_count}")
+                save_audio(audio_buf, "test_output.wav")
                 print("Audio saved to test_output.wav")
             else:
                 print("No audio data received")
@@ -69,24 +92,18 @@ async def test_streaming_tts():
     except Exception as e:
         print(f"Connection error: {e}")
 
-def save_audio_chunks(audio_chunks, filename):
+def save_audio(audio_data, filename):
     """
-    오디오 청크들을 WAV 파일로 저장
+    수신한 PCM 오디오를 WAV 파일로 저장
 
     Args:
-        audio_chunks (list): 오디오 청크 리스트
+        audio_data (bytes | bytearray): 이어붙인 16-bit PCM 데이터
         filename (str): 저장할 파일명
     """
     try:
-        # 모든 청크를 연결
-        audio_data = b''.join(audio_chunks)
-
-        # WAV 파일로 저장 (16-bit, 24kHz, mono)
-        with wave.open(filename, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(24000)  # 24kHz
-            wav_file.writeframes(audio_data)
+        # 버퍼를 복사 없이 int16 배열로 보고 libsndfile로 바로 저장 (16-bit, 24kHz, mono)
+        samples = np.frombuffer(audio_data, dtype='<i2', count=len(audio_data) // 2)
+        sf.write(filename, samples, 24000, subtype='PCM_16')
 
         print(f"Saved {len(audio_data)} bytes to {filename}")
 
@@ -100,7 +117,7 @@ async def test_language_change():
     uri = "ws://localhost:6001/ws/tts"
 
     try:
-        async with websockets.connect(uri) as websocket:
+        async with websockets.connect(uri, **CONNECT_OPTIONS) as websocket:
             print("Testing language change...")
 
             # 연결 확인
@@ -116,29 +133,35 @@ async def test_language_change():
             await websocket.send("Hello, this is English text-to-speech test.")
 
             # 응답 처리
-            audio_chunks = []
-            while True:
-                try:
-                    response = await asyncio.wait_for(websocket.recv(), timeout=10.0)
+            audio_buf = bytearray()
+
+            async def receive_audio():
+                while True:
+                    response = await websocket.recv()
 
                     if isinstance(response, str):
                         print(f"Message: {response}")
                         if response == "|AUDIO_END|":
                             break
                     elif isinstance(response, bytes):
-                        audio_chunks.append(response)
+                        audio_buf.extend(response)
 
-                except asyncio.TimeoutError:
-                    break
+            try:
+                await asyncio.wait_for(receive_audio(), timeout=RECEIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
 
-            if audio_chunks:
-                save_audio_chunks(audio_chunks, "test_english.wav")
+            if audio_buf:
+                save_audio(audio_buf, "test_english.wav")
                 print("English audio saved to test_english.wav")
 
     except Exception as e:
         print(f"Language test error: {e}")
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+
     print("=== WebSocket TTS Streaming Test ===")
 
     # 기본 스트리밍 테스트
@@ -5,125 +5,148 @@ WebSocket 기능 테스트
 
 import asyncio
 import json
-import aiohttp
 import sys
 import time
+import aiohttp
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 로컬 서버 주소 (IP 리터럴이라 DNS 조회 없음)
+WS_BASE_URL = "ws://127.0.0.1:6001"
+
+def _make_connector():
+    """루프백 전용 커넥터 (실행 중인 이벤트 루프 안에서 생성해야 하므로 함수로 제공)"""
+    return aiohttp.TCPConnector(limit=8, use_dns_cache=True, ttl_dns_cache=300, force_close=False)
 
-async def test_websocket_connection():
+def _dumps(message):
+    """메시지 직렬화 (서버가 receive_text()로 받으므로 텍스트 프레임용 str 반환)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message).decode()
+    return json.dumps(message)
+
+def _loads(data):
+    """텍스트/바이너리 프레임 역직렬화"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 응답으로 처리할 데이터 프레임 타입
+WS_DATA_TYPES = (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY)
+
+# 연결 종료를 뜻하는 메시지 타입 (async for 루프가 자동으로 멈추던 경우)
+WS_CLOSED_TYPES = (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED)
+
+async def test_websocket_connection(session):
     """WebSocket 연결 및 기능 테스트"""
     print("🔌 WebSocket 기능 테스트")
     print("=" * 40)
 
-    # WebSocket 엔드포인트 테스트
+    # WebSocket 엔드포인트별 시나리오 (같은 엔드포인트의 시나리오는 한 연결에서 순서대로 실행)
     endpoints = [
-        ("ws://localhost:6001/ws/chat", "음성 대화"),
-        ("ws://localhost:6001/ws/stt", "STT 전용")
+        (f"{WS_BASE_URL}/ws/chat", "음성 대화", [_do_ping, _do_auto_chat]),
+        (f"{WS_BASE_URL}/ws/stt", "STT 전용", [_do_ping])
     ]
 
-    for ws_url, description in endpoints:
+    for ws_url, description, scenarios in endpoints:
         print(f"\n📡 {description} ({ws_url})")
-        await test_websocket_endpoint(ws_url, description)
+        await test_websocket_endpoint(session, ws_url, scenarios)
 
-async def test_websocket_endpoint(ws_url, description):
-    """개별 WebSocket 엔드포인트 테스트"""
+async def test_websocket_endpoint(session, ws_url, scenarios):
+    """개별 WebSocket 엔드포인트 테스트 (연결 한 번으로 모든 시나리오 실행)"""
     try:
-        session = aiohttp.ClientSession()
-
         # WebSocket 연결
         async with session.ws_connect(ws_url, timeout=aiohttp.ClientTimeout(total=10)) as ws:
             print(f"   ✅ 연결 성공")
 
-            # 1. 핑 테스트
-            ping_message = {
-                "type": "ping",
-                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-
-            await ws.send_str(json.dumps(ping_message))
-            print(f"   📤 핑 메시지 전송: {ping_message['type']}")
-
-            # 응답 대기 (최대 5초)
-            try:
-                async with asyncio.timeout(5):
-                    async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            response = json.loads(msg.data)
-                            print(f"   📨 응답 수신: {response.get('type', 'unknown')}")
-
-                            if response.get('type') == 'pong':
-                                print(f"   ✅ 핑/퐁 테스트 성공")
-                                break
-                            elif response.get('type') == 'error':
-                                print(f"   ❌ 서버 오류: {response.get('message', '알 수 없는 오류')}")
-                                break
-                        elif msg.type == aiohttp.WSMsgType.ERROR:
-                            print(f"   ❌ WebSocket 오류: {ws.exception()}")
-                            break
-
-            except asyncio.TimeoutError:
-                print(f"   ⏰ 응답 타임아웃 (5초)")
-
-        await session.close()
+            for scenario in scenarios:
+                await scenario(ws)
 
     except aiohttp.ClientConnectionError as e:
         print(f"   ❌ 연결 실패: {e}")
     except Exception as e:
         print(f"   ❌ 오류: {e}")
 
-async def test_chat_websocket_features():
-    """채팅 WebSocket 고급 기능 테스트"""
-    print(f"\n🎯 채팅 WebSocket 고급 기능 테스트")
-    print("-" * 30)
+async def _do_ping(ws):
+    """핑/퐁 테스트"""
+    ping_message = {
+        "type": "ping",
+        "timestamp": time.time()  # 서버는 pong에 그대로 돌려주기만 하므로 포맷팅 불필요
+    }
+
+    await ws.send_str(_dumps(ping_message))
+    print(f"   📤 핑 메시지 전송: {ping_message['type']}")
 
+    # 응답 대기 (메시지당 최대 5초)
     try:
-        session = aiohttp.ClientSession()
-        ws_url = "ws://localhost:6001/ws/chat"
+        while True:
+            msg = await ws.receive(timeout=5)
+            if msg.type in WS_DATA_TYPES:
+                response = _loads(msg.data)
+                print(f"   📨 응답 수신: {response.get('type', 'unknown')}")
+
+                if response.get('type') == 'pong':
+                    print(f"   ✅ 핑/퐁 테스트 성공")
+                    break
+                elif response.get('type') == 'error':
+                    print(f"   ❌ 서버 오류: {response.get('message', '알 수 없는 오류')}")
+                    break
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                print(f"   ❌ WebSocket 오류: {ws.exception()}")
+                break
+            elif msg.type in WS_CLOSED_TYPES:
+                break
+
+    except asyncio.TimeoutError:
+        print(f"   ⏰ 응답 타임아웃 (5초)")
+
+async def _do_auto_chat(ws):
+    """채팅 WebSocket 고급 기능 테스트 (자동 대화 시작/중지)"""
+    print(f"\n🎯 채팅 WebSocket 고급 기능 테스트")
+    print("-" * 30)
 
-        async with session.ws_connect(ws_url, timeout=aiohttp.ClientTimeout(total=10)) as ws:
-            print(f"   ✅ 연결 성공")
+    # 자동 대화 시작 테스트
+    auto_chat_message = {
+        "type": "auto_chat_start",
+        "theme": "casual",
+        "interval": 30
+    }
 
-            # 자동 대화 시작 테스트
-            auto_chat_message = {
-                "type": "auto_chat_start",
-                "theme": "casual",
-                "interval": 30
-            }
-
-            await ws.send_str(json.dumps(auto_chat_message))
-            print(f"   📤 자동 대화 시작 요청")
-
-            # 응답 확인
-            try:
-                async with asyncio.timeout(5):
-                    async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            response = json.loads(msg.data)
-                            msg_type = response.get('type', 'unknown')
-                            print(f"   📨 응답: {msg_type}")
-
-                            if msg_type == 'auto_chat_started':
-                                session_id = response.get('session_id', '')
-                                print(f"   ✅ 자동 대화 시작됨 (세션: {session_id[:8]}...)")
-
-                                # 자동 대화 중지
-                                stop_message = {"type": "auto_chat_stop"}
-                                await ws.send_str(json.dumps(stop_message))
-                                print(f"   📤 자동 대화 중지 요청")
-
-                            elif msg_type == 'auto_chat_stopped':
-                                print(f"   ✅ 자동 대화 중지됨")
-                                break
-                            elif msg_type == 'error':
-                                print(f"   ❌ 오류: {response.get('message', '알 수 없는 오류')}")
-                                break
-
-            except asyncio.TimeoutError:
-                print(f"   ⏰ 응답 타임아웃")
-
-        await session.close()
+    await ws.send_str(_dumps(auto_chat_message))
+    print(f"   📤 자동 대화 시작 요청")
 
-    except Exception as e:
-        print(f"   ❌ 오류: {e}")
+    # 응답 확인
+    try:
+        while True:
+            msg = await ws.receive(timeout=5)
+            if msg.type in WS_DATA_TYPES:
+                response = _loads(msg.data)
+                msg_type = response.get('type', 'unknown')
+                print(f"   📨 응답: {msg_type}")
+
+                if msg_type == 'auto_chat_started':
+                    session_id = response.get('session_id', '')
+                    print(f"   ✅ 자동 대화 시작됨 (세션: {session_id[:8]}...)")
+
+                    # 자동 대화 중지
+                    stop_message = {"type": "auto_chat_stop"}
+                    await ws.send_str(_dumps(stop_message))
+                    print(f"   📤 자동 대화 중지 요청")
+
+                elif msg_type == 'auto_chat_stopped':
+                    print(f"   ✅ 자동 대화 중지됨")
+                    break
+                elif msg_type == 'error':
+                    print(f"   ❌ 오류: {response.get('message', '알 수 없는 오류')}")
+                    break
+            elif msg.type in WS_CLOSED_TYPES:
+                break
+
+    except asyncio.TimeoutError:
+        print(f"   ⏰ 응답 타임아웃")
 
 def main():
     """메인 함수"""
@@ -139,8 +162,9 @@ def main():
 
 async def run_all_tests():
     """모든 테스트 실행"""
-    await test_websocket_connection()
-    await test_chat_websocket_features()
+    # 모든 엔드포인트가 커넥터/DNS 캐시를 공유하도록 세션 하나만 생성
+    async with aiohttp.ClientSession(connector=_make_connector()) as session:
+        await test_websocket_connection(session)
 
     print("\n" + "=" * 40)
     print("🎯 WebSocket 테스트 완료!")
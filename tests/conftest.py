@@ -7,7 +7,10 @@ import asyncio
 import tempfile
 import os
 import shutil
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 
@@ -19,6 +22,28 @@ from config.settings import *
 from models.model_manager import ModelManager
 from websocket.connection_manager import ConnectionManager
 
+try:
+    import pybase64 as base64  # SIMD 가속 base64 (설치된 경우)
+except ImportError:
+    import base64
+
+# 무음 데이터 8000 샘플 * 2바이트 (16kHz에서 0.5초) - 픽스처마다 다시 만들지 않도록 모듈 상수로 둠
+_SILENCE = bytes(16000)
+
+# 간단한 PCM WAV 헤더 (RIFF/fmt/data 청크를 한 번에 pack)
+_WAV_HEADER = struct.pack(
+    "<4sI4s4sIHHIIHH4sI",
+    b"RIFF", 36 + len(_SILENCE), b"WAVE",  # 파일 크기
+    b"fmt ", 16,  # fmt 청크
+    1,  # PCM 포맷
+    1,  # 모노
+    16000,  # 샘플레이트
+    32000,  # 바이트레이트
+    2,  # 블록 얼라인
+    16,  # 비트 뎁스
+    b"data", len(_SILENCE)  # 데이터 청크
+)
+
 @pytest.fixture(scope="session")
 def event_loop():
     """세션 범위 이벤트 루프"""
@@ -34,30 +59,28 @@ def temp_dir():
     yield temp_dir
     shutil.rmtree(temp_dir)
 
+@pytest.fixture(scope="session")
+def sample_audio_bytes():
+    """테스트용 샘플 오디오 바이트 (무음 WAV) - 업로드/인코딩만 하는 테스트는 파일 없이 사용"""
+    return _WAV_HEADER + _SILENCE
+
+@pytest.fixture(scope="session")
+def sample_audio_b64(sample_audio_bytes):
+    """샘플 오디오의 base64 문자열 (세션당 한 번만 인코딩)"""
+    return base64.b64encode(sample_audio_bytes).decode("ascii")
+
 @pytest.fixture
-def sample_audio_file(temp_dir):
-    """테스트용 샘플 오디오 파일"""
-    # 간단한 WAV 파일 헤더 (무음)
-    wav_header = (
-        b'RIFF' + (44 + 16000).to_bytes(4, 'little') +  # 파일 크기
-        b'WAVE' + b'fmt ' + (16).to_bytes(4, 'little') +  # fmt 청크
-        (1).to_bytes(2, 'little') +  # PCM 포맷
-        (1).to_bytes(2, 'little') +  # 모노
-        (16000).to_bytes(4, 'little') +  # 샘플레이트
-        (32000).to_bytes(4, 'little') +  # 바이트레이트
-        (2).to_bytes(2, 'little') +  # 블록 얼라인
-        (16).to_bytes(2, 'little') +  # 비트 뎁스
-        b'data' + (16000).to_bytes(4, 'little')  # 데이터 청크
-    )
-
-    # 1초 무음 데이터 (16000 샘플 * 2바이트)
-    silence_data = b'\x00\x00' * 8000
-
-    audio_path = os.path.join(temp_dir, "test_audio.wav")
-    with open(audio_path, "wb") as f:
-        f.write(wav_header + silence_data)
-
-    return audio_path
+def sample_audio_file(tmp_path, sample_audio_bytes):
+    """테스트용 샘플 오디오 파일 (실제 경로가 필요한 테스트용)"""
+    audio_path = tmp_path / "test_audio.wav"
+    audio_path.write_bytes(sample_audio_bytes)
+    return str(audio_path)
+
+@pytest.fixture(scope="session")
+def pool():
+    """동시 요청 테스트용 스레드 풀 (세션 동안 워커 스레드 재사용)"""
+    with ThreadPoolExecutor(max_workers=16) as p:
+        yield p
 
 @pytest.fixture
 def mock_model_manager():
@@ -98,16 +121,43 @@ def connection_manager():
     """WebSocket 연결 매니저"""
     return ConnectionManager()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_app():
     """테스트용 FastAPI 앱"""
     from web_voice_chat_new import app
     return app
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(test_app):
-    """테스트 클라이언트"""
-    return TestClient(test_app)
+    """테스트 클라이언트 (WebSocket 핸드셰이크를 위해 세션당 한 번 startup 실행)
+
+    startup의 실제 모델 로드는 목으로 대체 - 단위 테스트가 TTS/STT 모델을 올리지 않도록
+    """
+    with patch("web_voice_chat_new.model_manager.initialize_models", new_callable=AsyncMock), \
+         TestClient(test_app) as c:
+        yield c
+
+@pytest.fixture
+def fresh_ws(client):
+    """테스트 전용 /ws/chat 연결 (테스트 사이에 연결 상태가 새지 않도록 매번 새로 연결)"""
+    with client.websocket_connect("/ws/chat") as s:
+        yield s
+
+def _fetch_json(client, path):
+    """GET 요청 후 상태 코드 확인 및 JSON 반환"""
+    response = client.get(path)
+    response.raise_for_status()
+    return response.json()
+
+@pytest.fixture(scope="session")
+def languages_payload(client):
+    """/api/languages 응답 (세션당 한 번만 요청)"""
+    return _fetch_json(client, "/api/languages")
+
+@pytest.fixture(scope="session")
+def models_status_payload(client):
+    """/api/models/status 응답 (세션당 한 번만 요청)"""
+    return _fetch_json(client, "/api/models/status")
 
 @pytest.fixture
 def test_config():
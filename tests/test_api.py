@@ -5,25 +5,39 @@ API 엔드포인트 테스트
 import pytest
 import json
 import base64
+import io
 import os
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
+class _ZeroStream(io.RawIOBase):
+    """지정한 크기만큼 0 바이트를 내주는 스트림 (전체를 메모리에 올리지 않음)"""
+
+    def __init__(self, size):
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.remaining)
+        buffer[:n] = bytes(n)
+        self.remaining -= n
+        return n
+
 class TestAPIEndpoints:
     """API 엔드포인트 테스트"""
 
-    def test_root_endpoint(self, client):
-        """루트 엔드포인트 테스트"""
-        response = client.get("/")
+    @pytest.mark.parametrize("path", ["/", "/docs", "/redoc"])
+    def test_html_endpoints(self, client, path):
+        """HTML 엔드포인트 테스트 (루트, API 문서, ReDoc)"""
+        response = client.get(path)
         assert response.status_code == 200
         assert "text/html" in response.headers["content-type"]
 
-    def test_models_status_endpoint(self, client):
+    def test_models_status_endpoint(self, models_status_payload):
         """모델 상태 API 테스트"""
-        response = client.get("/api/models/status")
-        assert response.status_code == 200
-
-        data = response.json()
+        data = models_status_payload
         required_fields = [
             "tts_available", "stt_available", "tts_device",
             "cuda_available", "stt_model_size"
@@ -32,12 +46,9 @@ class TestAPIEndpoints:
         for field in required_fields:
             assert field in data
 
-    def test_languages_endpoint(self, client):
+    def test_languages_endpoint(self, languages_payload):
         """지원 언어 목록 API 테스트"""
-        response = client.get("/api/languages")
-        assert response.status_code == 200
-
-        data = response.json()
+        data = languages_payload
         assert "languages" in data
         assert isinstance(data["languages"], list)
         assert len(data["languages"]) > 0
@@ -94,7 +105,7 @@ class TestAPIEndpoints:
         assert response.status_code in [400, 500]
 
     @patch('models.model_manager.model_manager')
-    def test_stt_endpoint_success(self, mock_manager, client, sample_audio_file):
+    def test_stt_endpoint_success(self, mock_manager, client, sample_audio_bytes):
         """STT API 성공 테스트"""
         # STT 결과 모킹
         mock_manager.transcribe_audio.return_value = {
@@ -103,9 +114,8 @@ class TestAPIEndpoints:
             "confidence": 0.95
         }
 
-        with open(sample_audio_file, "rb") as f:
-            files = {"audio": ("test.webm", f, "audio/webm")}
-            response = client.post("/api/stt", files=files)
+        files = {"audio": ("test.webm", sample_audio_bytes, "audio/webm")}
+        response = client.post("/api/stt", files=files)
 
         assert response.status_code == 200
 
@@ -149,18 +159,6 @@ class TestAPIEndpoints:
         assert response.status_code == 200
         assert "javascript" in response.headers.get("content-type", "")
 
-    def test_docs_endpoint(self, client):
-        """API 문서 엔드포인트 테스트"""
-        response = client.get("/docs")
-        assert response.status_code == 200
-        assert "text/html" in response.headers["content-type"]
-
-    def test_redoc_endpoint(self, client):
-        """ReDoc 엔드포인트 테스트"""
-        response = client.get("/redoc")
-        assert response.status_code == 200
-        assert "text/html" in response.headers["content-type"]
-
 class TestAPIValidation:
     """API 입력 검증 테스트"""
 
@@ -191,9 +189,10 @@ class TestAPIValidation:
 
     def test_file_upload_limits(self, client):
         """파일 업로드 제한 테스트"""
-        # 너무 큰 파일 (10MB)
-        large_data = b"0" * (10 * 1024 * 1024)
-        files = {"audio": ("large.webm", large_data, "audio/webm")}
+        # 너무 큰 파일 (10MB) - 테스트 코드에서 bytes로 미리 만들지 않음
+        # (TestClient는 요청 본문 전체를 읽어 앱에 넘기므로 전송 중 메모리 사용량까지 줄지는 않음)
+        large_stream = io.BufferedReader(_ZeroStream(10 * 1024 * 1024))
+        files = {"audio": ("large.webm", large_stream, "audio/webm")}
 
         response = client.post("/api/stt", files=files)
         # 파일 크기 제한에 따라 413 또는 400 응답
@@ -202,35 +201,20 @@ class TestAPIValidation:
 class TestAPIPerformance:
     """API 성능 테스트"""
 
-    def test_concurrent_requests(self, client):
+    def test_concurrent_requests(self, client, pool):
         """동시 요청 처리 테스트"""
-        import threading
         import time
 
-        results = []
-
-        def make_request():
-            start_time = time.time()
+        def make_request(_):
+            start_time = time.perf_counter()
             response = client.get("/api/models/status")
-            end_time = time.time()
-            results.append({
+            return {
                 "status_code": response.status_code,
-                "response_time": end_time - start_time
-            })
-
-        # 5개의 동시 요청
-        threads = []
-        for _ in range(5):
-            thread = threading.Thread(target=make_request)
-            threads.append(thread)
-
-        # 모든 스레드 시작
-        for thread in threads:
-            thread.start()
+                "response_time": time.perf_counter() - start_time
+            }
 
-        # 모든 스레드 완료 대기
-        for thread in threads:
-            thread.join()
+        # 5개의 동시 요청 (스레드 풀이 결과를 순서대로 모아 반환)
+        results = list(pool.map(make_request, range(5)))
 
         # 결과 검증
         assert len(results) == 5
@@ -250,12 +234,12 @@ class TestAPIPerformance:
         ]
 
         for endpoint in endpoints:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             response = client.get(endpoint)
-            end_time = time.time()
+            elapsed = (time.perf_counter_ns() - start_ns) / 1e9
 
             assert response.status_code == 200
-            assert end_time - start_time < 2.0  # 2초 이내
+            assert elapsed < 2.0  # 2초 이내
 
 class TestAPIErrors:
     """API 오류 처리 테스트"""
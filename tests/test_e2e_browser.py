@@ -5,6 +5,10 @@ E2E 브라우저 자동화 테스트
 import pytest
 import time
 import json
+
+# selenium이 없는 환경에서는 모듈 전체를 건너뜀 (다른 테스트 수집에 영향 없음)
+pytest.importorskip("selenium")
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -12,6 +16,42 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+# 페이지 요소 상태를 한 번의 WebDriver 왕복으로 수집하는 스크립트
+_DOM_PROBE_JS = """
+const visible = el => !!el && el.getClientRects().length > 0;
+const record = document.getElementById('recordButton');
+const messages = document.getElementById('messages');
+return {
+    record_present: !!record,
+    record: visible(record),
+    record_candidates: document.querySelectorAll("[class*='record'], [id*='record'], button").length,
+    messages: messages ? visible(messages) : null,
+    stylesheets: document.querySelectorAll('link[rel=stylesheet]').length,
+    voice_chat_script: Array.from(document.scripts).some(s => s.src.includes('voice-chat')),
+    inline_scripts: Array.from(document.scripts).filter(s => s.innerHTML.length > 100).length
+};
+"""
+
+def probe_dom(browser):
+    """_DOM_PROBE_JS 실행 결과 (dict)"""
+    return browser.execute_script(_DOM_PROBE_JS)
+
+# 요소 텍스트에 기대 문자열이 나타날 때까지 MutationObserver로 대기 (폴링 없이 DOM 변경 시점에 깨어남)
+_WAIT_TEXT_JS = """
+const [id, expected, done] = arguments;
+const el = document.getElementById(id);
+if (el.innerText.includes(expected)) { done(el.innerText); return; }
+const obs = new MutationObserver(() => {
+    if (el.innerText.includes(expected)) { obs.disconnect(); done(el.innerText); }
+});
+obs.observe(el, {childList: true, subtree: true, characterData: true});
+"""
+
+def wait_for_text(browser, element_id, expected, timeout=10):
+    """element_id 요소에 expected 문자열이 나타나면 그 시점의 innerText 반환"""
+    browser.set_script_timeout(timeout)
+    return browser.execute_async_script(_WAIT_TEXT_JS, element_id, expected)
+
 @pytest.fixture(scope="module")
 def browser():
     """브라우저 픽스처"""
@@ -35,7 +75,7 @@ def browser():
         if 'driver' in locals():
             driver.quit()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def server_url():
     """서버 URL"""
     return "http://localhost:6001"
@@ -59,56 +99,42 @@ class TestMainPage:
         """UI 요소 존재 확인"""
         browser.get(server_url)
 
-        # 녹음 버튼 확인
+        # 동적으로 그려지는 UI를 위해 녹음 버튼이 생길 때까지 대기 (없으면 다른 셀렉터 후보 확인)
         try:
-            record_button = WebDriverWait(browser, 10).until(
+            WebDriverWait(browser, 10).until(
                 EC.presence_of_element_located((By.ID, "recordButton"))
             )
-            assert record_button.is_displayed()
         except TimeoutException:
-            # 다른 셀렉터로 시도
-            record_elements = browser.find_elements(By.CSS_SELECTOR, "[class*='record'], [id*='record'], button")
-            assert len(record_elements) > 0
+            pass
+        result = probe_dom(browser)
 
-        # 메시지 영역 확인
-        try:
-            messages_area = browser.find_element(By.ID, "messages")
-            assert messages_area.is_displayed()
-        except:
-            # 대체 셀렉터로 시도
-            message_elements = browser.find_elements(By.CSS_SELECTOR, "[class*='message'], [id*='message'], .chat")
-            assert len(message_elements) >= 0  # 메시지가 없을 수도 있음
+        # 녹음 버튼이 있으면 반드시 화면에 보여야 함
+        if result["record_present"]:
+            assert result["record"]
+        else:
+            assert result["record_candidates"] > 0
+
+        # 메시지 영역 확인 (있다면 화면에 보여야 함, 메시지가 없을 수도 있음)
+        assert result["messages"] is not False
 
     def test_css_loading(self, browser, server_url):
         """CSS 로딩 테스트"""
         browser.get(server_url)
 
         # 스타일시트가 로드되었는지 확인
-        stylesheets = browser.find_elements(By.TAG_NAME, "link")
-        css_loaded = any(
-            link.get_attribute("rel") == "stylesheet"
-            for link in stylesheets
-        )
-        assert css_loaded
+        assert probe_dom(browser)["stylesheets"] > 0
 
     def test_javascript_loading(self, browser, server_url):
         """JavaScript 로딩 테스트"""
         browser.get(server_url)
 
         # JavaScript 파일이 로드되었는지 확인
-        scripts = browser.find_elements(By.TAG_NAME, "script")
-        js_loaded = any(
-            script.get_attribute("src") and "voice-chat" in script.get_attribute("src")
-            for script in scripts
-        )
+        result = probe_dom(browser)
+        js_loaded = result["voice_chat_script"]
 
         # 인라인 스크립트도 확인
         if not js_loaded:
-            inline_scripts = [
-                script for script in scripts
-                if script.get_attribute("innerHTML") and len(script.get_attribute("innerHTML")) > 100
-            ]
-            assert len(inline_scripts) > 0
+            assert result["inline_scripts"] > 0
 
 class TestQuickTestPage:
     """빠른 테스트 페이지 E2E 테스트"""
@@ -142,18 +168,12 @@ class TestQuickTestPage:
         mic_button.click()
 
         # 로그 영역에서 결과 확인
-        log_area = WebDriverWait(browser, 10).until(
+        WebDriverWait(browser, 10).until(
             EC.presence_of_element_located((By.ID, "log"))
         )
 
-        # 권한 요청 메시지가 나타나는지 확인
-        WebDriverWait(browser, 5).until(
-            lambda driver: "마이크 권한" in log_area.text
-        )
-
-        # 결과 확인 (성공 또는 실패)
-        time.sleep(2)  # 권한 처리 대기
-        log_text = log_area.text
+        # 권한 요청 메시지가 나타나는지 확인 (성공 또는 실패)
+        log_text = wait_for_text(browser, "log", "마이크 권한", timeout=5)
         assert "마이크 권한" in log_text
 
     def test_websocket_connection(self, browser, server_url):
@@ -167,18 +187,12 @@ class TestQuickTestPage:
         ws_button.click()
 
         # 로그 영역에서 연결 결과 확인
-        log_area = WebDriverWait(browser, 10).until(
+        WebDriverWait(browser, 10).until(
             EC.presence_of_element_located((By.ID, "log"))
         )
 
         # WebSocket 연결 메시지 확인
-        WebDriverWait(browser, 10).until(
-            lambda driver: "WebSocket" in log_area.text
-        )
-
-        # 연결 성공 여부 확인
-        time.sleep(3)  # 연결 및 응답 대기
-        log_text = log_area.text
+        log_text = wait_for_text(browser, "log", "WebSocket", timeout=10)
         assert "WebSocket" in log_text
 
 class TestAudioWorkflow:
@@ -233,44 +247,40 @@ class TestAudioWorkflow:
 class TestResponsiveness:
     """반응형 디자인 테스트"""
 
-    def test_mobile_responsiveness(self, browser, server_url):
-        """모바일 반응형 테스트"""
-        browser.get(server_url)
-
-        # 모바일 크기로 변경
-        browser.set_window_size(375, 667)  # iPhone 6/7/8 크기
-
-        # 페이지가 올바르게 렌더링되는지 확인
-        body = browser.find_element(By.TAG_NAME, "body")
-        assert body.is_displayed()
-
-        # 가로 스크롤이 생기지 않는지 확인
-        body_width = browser.execute_script("return document.body.scrollWidth;")
-        window_width = browser.execute_script("return window.innerWidth;")
-
-        assert body_width <= window_width + 50  # 약간의 여유 허용
-
-    def test_tablet_responsiveness(self, browser, server_url):
-        """태블릿 반응형 테스트"""
+    @pytest.fixture(scope="class")
+    def responsive_page(self, browser, server_url):
+        """페이지를 한 번만 로드하고 뷰포트는 CDP 에뮬레이션으로 바꿔가며 재사용"""
         browser.get(server_url)
-
-        # 태블릿 크기로 변경
-        browser.set_window_size(768, 1024)  # iPad 크기
+        yield browser
+        browser.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+
+    @pytest.mark.parametrize("device, width, height", [
+        ("mobile", 375, 667),  # iPhone 6/7/8 크기
+        ("tablet", 768, 1024),  # iPad 크기
+        ("desktop", 1920, 1080),
+    ])
+    def test_responsiveness(self, responsive_page, device, width, height):
+        """모바일/태블릿/데스크톱 반응형 테스트"""
+        browser = responsive_page
+
+        # 창 크기 변경 대신 디바이스 메트릭 에뮬레이션 (OS 창 리사이즈 없이 레이아웃만 다시 계산)
+        browser.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+            "width": width,
+            "height": height,
+            "deviceScaleFactor": 1 if device == "desktop" else 2,
+            "mobile": device != "desktop"
+        })
 
         # 페이지가 올바르게 렌더링되는지 확인
         body = browser.find_element(By.TAG_NAME, "body")
         assert body.is_displayed()
 
-    def test_desktop_responsiveness(self, browser, server_url):
-        """데스크톱 반응형 테스트"""
-        browser.get(server_url)
-
-        # 데스크톱 크기로 변경
-        browser.set_window_size(1920, 1080)
-
-        # 페이지가 올바르게 렌더링되는지 확인
-        body = browser.find_element(By.TAG_NAME, "body")
-        assert body.is_displayed()
+        if device == "mobile":
+            # 가로 스크롤이 생기지 않는지 확인
+            body_width, window_width = browser.execute_script(
+                "return [document.body.scrollWidth, window.innerWidth];"
+            )
+            assert body_width <= window_width + 50  # 약간의 여유 허용
 
 class TestAPIIntegration:
     """API 통합 테스트"""
@@ -304,7 +314,7 @@ class TestPerformance:
     @pytest.mark.slow
     def test_page_load_time(self, browser, server_url):
         """페이지 로딩 시간 테스트"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         browser.get(server_url)
 
         # 페이지 완전 로딩 대기
@@ -312,8 +322,7 @@ class TestPerformance:
             lambda driver: driver.execute_script("return document.readyState") == "complete"
         )
 
-        end_time = time.time()
-        load_time = end_time - start_time
+        load_time = (time.perf_counter_ns() - start_ns) / 1e9
 
         # 10초 이내에 로딩되어야 함
         assert load_time < 10.0
@@ -5,16 +5,34 @@
 import pytest
 import asyncio
 import json
-import base64
 import tempfile
-import os
+import weakref
+from collections import Counter, deque
+from statistics import fmean
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 
+from websocket.connection_manager import dumps, loads
+
+def ws_send(ws, message):
+    """메시지 직렬화 후 텍스트 프레임으로 전송 (서버와 같은 직렬화 사용)"""
+    ws.send_text(dumps(message))
+
+# 연결별로 batch 프레임에서 풀어 두었지만 아직 꺼내지 않은 메시지
+_pending_messages = weakref.WeakKeyDictionary()
+
+def ws_recv(ws):
+    """메시지 하나 수신 (서버가 여러 메시지를 batch 프레임으로 묶어 보내면 풀어서 차례로 반환)"""
+    pending = _pending_messages.setdefault(ws, deque())
+    if not pending:
+        data = loads(ws.receive_text())
+        pending.extend(data["items"] if data.get("type") == "batch" else [data])
+    return pending.popleft()
+
 class TestFullSystemIntegration:
     """전체 시스템 통합 테스트"""
 
-    def test_tts_stt_pipeline(self, client, mock_model_manager, sample_audio_file):
+    def test_tts_stt_pipeline(self, client, mock_model_manager, sample_audio_bytes):
         """TTS -> STT 파이프라인 테스트"""
         # 1. TTS로 음성 생성
         tts_data = {
@@ -28,41 +46,36 @@ class TestFullSystemIntegration:
             assert tts_response.status_code == 200
 
             # 2. 생성된 음성을 STT로 변환
-            with open(sample_audio_file, "rb") as f:
-                files = {"audio": ("test.webm", f, "audio/webm")}
-                stt_response = client.post("/api/stt", files=files)
+            files = {"audio": ("test.webm", sample_audio_bytes, "audio/webm")}
+            stt_response = client.post("/api/stt", files=files)
 
             assert stt_response.status_code == 200
             stt_data = stt_response.json()
             assert "text" in stt_data
             assert stt_data["success"] is True
 
-    def test_websocket_audio_pipeline(self, client, sample_audio_file):
+    def test_websocket_audio_pipeline(self, fresh_ws, sample_audio_b64):
         """WebSocket 오디오 파이프라인 통합 테스트"""
-        with client.websocket_connect("/ws/chat") as websocket:
-            # 오디오 파일을 base64로 인코딩
-            with open(sample_audio_file, "rb") as f:
-                audio_data = base64.b64encode(f.read()).decode()
-
-            # 오디오 메시지 전송
-            message = {
-                "type": "audio",
-                "data": audio_data,
-                "timestamp": "2025-09-29T14:38:00Z"
-            }
+        # 미리 인코딩된 base64 오디오 사용
+        audio_data = sample_audio_b64
+
+        # 오디오 메시지 전송
+        message = {
+            "type": "audio",
+            "data": audio_data,
+            "timestamp": "2025-09-29T14:38:00Z"
+        }
 
-            websocket.send_text(json.dumps(message))
+        ws_send(fresh_ws, message)
 
-            # 사용자 메시지 응답 수신
-            response1 = websocket.receive_text()
-            response1_data = json.loads(response1)
-            assert response1_data["type"] == "user_message"
+        # 사용자 메시지 응답 수신
+        response1_data = ws_recv(fresh_ws)
+        assert response1_data["type"] == "user_message"
 
-            # 시스템 응답 수신
-            response2 = websocket.receive_text()
-            response2_data = json.loads(response2)
-            assert response2_data["type"] == "system_response"
-            assert "audio_url" in response2_data
+        # 시스템 응답 수신
+        response2_data = ws_recv(fresh_ws)
+        assert response2_data["type"] == "system_response"
+        assert "audio_url" in response2_data
 
     def test_api_model_consistency(self, client):
         """API 간 모델 상태 일관성 테스트"""
@@ -80,13 +93,10 @@ class TestFullSystemIntegration:
         if status_data["tts_available"]:
             assert len(languages_data["languages"]) > 0
 
-    def test_concurrent_requests(self, client):
+    def test_concurrent_requests(self, client, pool):
         """동시 요청 처리 테스트"""
-        import threading
         import time
 
-        results = []
-
         def make_tts_request():
             try:
                 response = client.post("/api/tts", json={
@@ -94,31 +104,20 @@ class TestFullSystemIntegration:
                     "language": "KR",
                     "speed": 1.0
                 })
-                results.append(response.status_code)
+                return response.status_code
             except Exception as e:
-                results.append(f"Error: {e}")
+                return f"Error: {e}"
 
-        # 5개의 동시 TTS 요청
-        threads = []
-        for _ in range(5):
-            thread = threading.Thread(target=make_tts_request)
-            threads.append(thread)
+        start_time = time.perf_counter()
 
-        start_time = time.time()
+        # 5개의 동시 TTS 요청 (세션 스레드 풀 재사용)
+        results = list(pool.map(lambda _: make_tts_request(), range(5)))
 
-        # 모든 스레드 시작
-        for thread in threads:
-            thread.start()
-
-        # 모든 스레드 완료 대기
-        for thread in threads:
-            thread.join()
-
-        end_time = time.time()
+        end_time = time.perf_counter()
 
         # 결과 검증
         assert len(results) == 5
-        success_count = sum(1 for r in results if r == 200)
+        success_count = Counter(results)[200]
         assert success_count >= 3  # 최소 3개는 성공해야 함
 
         # 전체 처리 시간이 합리적인지 확인
@@ -142,34 +141,27 @@ class TestErrorHandlingIntegration:
             # 적절한 오류 응답이 반환되어야 함
             assert response.status_code in [400, 500]
 
-    def test_websocket_error_recovery(self, client):
+    def test_websocket_error_recovery(self, fresh_ws):
         """WebSocket 오류 복구 테스트"""
-        with client.websocket_connect("/ws/chat") as websocket:
-            # 잘못된 메시지 전송
-            websocket.send_text("invalid json")
-
-            # 정상 메시지 전송
-            ping_message = {
-                "type": "ping",
-                "timestamp": "2025-09-29T14:38:00Z"
-            }
-            websocket.send_text(json.dumps(ping_message))
+        # 잘못된 메시지 전송
+        fresh_ws.send_text("invalid json")
 
-            # pong 응답 수신 (연결이 유지되어야 함)
-            response = websocket.receive_text()
-            response_data = json.loads(response)
-            assert response_data["type"] == "pong"
+        # 정상 메시지 전송
+        ping_message = {
+            "type": "ping",
+            "timestamp": "2025-09-29T14:38:00Z"
+        }
+        ws_send(fresh_ws, ping_message)
 
-    def test_file_upload_error_handling(self, client, temp_dir):
-        """파일 업로드 오류 처리 테스트"""
-        # 잘못된 파일 형식
-        fake_audio = os.path.join(temp_dir, "fake.wav")
-        with open(fake_audio, "w") as f:
-            f.write("This is not audio")
+        # pong 응답 수신 (연결이 유지되어야 함)
+        response_data = ws_recv(fresh_ws)
+        assert response_data["type"] == "pong"
 
-        with open(fake_audio, "rb") as f:
-            files = {"audio": ("fake.webm", f, "audio/webm")}
-            response = client.post("/api/stt", files=files)
+    def test_file_upload_error_handling(self, client):
+        """파일 업로드 오류 처리 테스트"""
+        # 잘못된 파일 형식 (임시 파일 없이 메모리에서 바로 업로드)
+        files = {"audio": ("fake.webm", b"This is not audio", "audio/webm")}
+        response = client.post("/api/stt", files=files)
 
         # 적절한 오류 응답이 반환되어야 함
         assert response.status_code in [400, 422, 500]
@@ -191,26 +183,24 @@ class TestDataFlowIntegration:
             processed_file = mock_preprocess(sample_audio_file)
             assert processed_file == sample_audio_file
 
-    def test_websocket_message_flow(self, client):
+    def test_websocket_message_flow(self, fresh_ws):
         """WebSocket 메시지 플로우 테스트"""
-        with client.websocket_connect("/ws/chat") as websocket:
-            # 다양한 메시지 타입 테스트
-            message_types = [
-                {"type": "ping", "timestamp": "2025-09-29T14:38:00Z"},
-                {"type": "auto_chat_start", "theme": "casual", "interval": 30},
-                {"type": "auto_chat_stop"}
-            ]
-
-            for message in message_types:
-                websocket.send_text(json.dumps(message))
-
-                # 응답 수신
-                try:
-                    response = websocket.receive_text()
-                    response_data = json.loads(response)
-                    assert "type" in response_data
-                except Exception:
-                    pass  # 일부 메시지는 응답이 없을 수 있음
+        # 다양한 메시지 타입 테스트
+        message_types = [
+            {"type": "ping", "timestamp": "2025-09-29T14:38:00Z"},
+            {"type": "auto_chat_start", "theme": "casual", "interval": 30},
+            {"type": "auto_chat_stop"}
+        ]
+
+        for message in message_types:
+            ws_send(fresh_ws, message)
+
+            # 응답 수신
+            try:
+                response_data = ws_recv(fresh_ws)
+                assert "type" in response_data
+            except Exception:
+                pass  # 일부 메시지는 응답이 없을 수 있음
 
 class TestConfigurationIntegration:
     """설정 통합 테스트"""
@@ -245,7 +235,7 @@ class TestConfigurationIntegration:
 class TestSecurityIntegration:
     """보안 통합 테스트"""
 
-    def test_file_upload_security(self, client, temp_dir):
+    def test_file_upload_security(self, client):
         """파일 업로드 보안 테스트"""
         # 악성 파일명 테스트
         malicious_names = [
@@ -254,75 +244,60 @@ class TestSecurityIntegration:
             "test<script>alert('xss')</script>.wav"
         ]
 
-        for name in malicious_names:
-            fake_file = os.path.join(temp_dir, "test.wav")
-            with open(fake_file, "wb") as f:
-                f.write(b"fake audio data")
+        # 내용은 동일하므로 디스크에 쓰지 않고 업로드 파일명만 바꿔서 전송
+        fake_audio = b"fake audio data"
 
-            with open(fake_file, "rb") as f:
-                files = {"audio": (name, f, "audio/webm")}
-                response = client.post("/api/stt", files=files)
+        for name in malicious_names:
+            files = {"audio": (name, fake_audio, "audio/webm")}
+            response = client.post("/api/stt", files=files)
 
             # 요청이 적절히 거부되거나 처리되어야 함
             assert response.status_code in [200, 400, 422, 500]
 
-    def test_websocket_message_validation(self, client):
+    def test_websocket_message_validation(self, fresh_ws):
         """WebSocket 메시지 검증 테스트"""
-        with client.websocket_connect("/ws/chat") as websocket:
-            # 악성 메시지 전송 시도
-            malicious_messages = [
-                '{"type": "audio", "data": "' + 'A' * 10000 + '"}',  # 매우 긴 데이터
-                '{"type": "unknown_type", "malicious": true}',  # 알 수 없는 타입
-                '{"type": null, "data": null}'  # null 값
-            ]
-
-            for message in malicious_messages:
-                try:
-                    websocket.send_text(message)
-                    # 연결이 유지되거나 적절히 종료되어야 함
-                except Exception:
-                    pass  # 예외 발생은 정상적인 보안 동작
+        # 악성 메시지 전송 시도
+        malicious_messages = [
+            '{"type": "audio", "data": "' + 'A' * 10000 + '"}',  # 매우 긴 데이터
+            '{"type": "unknown_type", "malicious": true}',  # 알 수 없는 타입
+            '{"type": null, "data": null}'  # null 값
+        ]
+
+        for message in malicious_messages:
+            try:
+                fresh_ws.send_text(message)
+                # 연결이 유지되거나 적절히 종료되어야 함
+            except Exception:
+                pass  # 예외 발생은 정상적인 보안 동작
 
 class TestPerformanceIntegration:
     """성능 통합 테스트"""
 
     @pytest.mark.slow
-    def test_system_performance_under_load(self, client):
+    def test_system_performance_under_load(self, client, pool):
         """부하 상태에서의 시스템 성능 테스트"""
         import time
-        import threading
-
-        results = []
 
         def load_test():
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             response = client.get("/api/models/status")
-            end_time = time.time()
 
-            results.append({
+            return {
                 "status_code": response.status_code,
-                "response_time": end_time - start_time
-            })
-
-        # 10개의 동시 요청으로 부하 테스트
-        threads = []
-        for _ in range(10):
-            thread = threading.Thread(target=load_test)
-            threads.append(thread)
+                "response_time": (time.perf_counter_ns() - start_ns) / 1e9
+            }
 
-        # 모든 스레드 시작
-        for thread in threads:
-            thread.start()
+        # 워밍업 1회 (첫 요청의 지연 초기화 비용이 평균에 섞이지 않도록)
+        load_test()
 
-        # 모든 스레드 완료 대기
-        for thread in threads:
-            thread.join()
+        # 10개의 동시 요청으로 부하 테스트 (세션 스레드 풀 재사용)
+        results = list(pool.map(lambda _: load_test(), range(10)))
 
         # 성능 기준 검증
         assert len(results) == 10
 
-        success_rate = sum(1 for r in results if r["status_code"] == 200) / len(results)
+        success_rate = Counter(r["status_code"] for r in results)[200] / len(results)
         assert success_rate >= 0.8  # 80% 이상 성공률
 
-        avg_response_time = sum(r["response_time"] for r in results) / len(results)
+        avg_response_time = fmean(r["response_time"] for r in results)
         assert avg_response_time < 5.0  # 평균 5초 이내
\ No newline at end of file
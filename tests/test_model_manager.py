@@ -80,12 +80,12 @@ class TestModelManager:
         """모델 로딩 성능 테스트"""
         import time
 
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         status = mock_model_manager.get_status()
-        end_time = time.time()
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
 
         # 상태 조회는 1초 내에 완료되어야 함
-        assert end_time - start_time < 1.0
+        assert elapsed < 1.0
         assert status["tts_available"] is True
         assert status["stt_available"] is True
 
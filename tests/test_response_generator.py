@@ -0,0 +1,43 @@
+"""
+키워드 기반 응답 생성 테스트
+"""
+
+import pytest
+from unittest.mock import patch
+
+from utils import response_generator
+from utils.response_generator import generate_response, classify, DEFAULT_RESPONSE
+
+@pytest.fixture(params=[True, False], ids=["ahocorasick", "fallback"])
+def matcher(request):
+    """Aho-Corasick 오토마톤과 단순 스캔 경로를 모두 검증"""
+    if request.param and not response_generator.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick 미설치")
+    with patch.object(response_generator, "AHOCORASICK_AVAILABLE", request.param):
+        yield
+
+class TestResponseGenerator:
+    """응답 생성 테스트"""
+
+    @pytest.mark.parametrize("text,tag", [
+        ("안녕하세요", "greet"),
+        ("Hello there", "greet"),
+        ("오늘 날씨 어때?", "weather"),
+        ("What is your NAME", "name"),
+        ("지금 몇 시간이야", "time"),
+        ("아무 말", None),
+    ])
+    def test_classify(self, matcher, text, tag):
+        """키워드 분류 테스트"""
+        assert classify(text) == tag
+
+    def test_priority_follows_keyword_order(self, matcher):
+        """여러 키워드가 있을 때 기존 if/elif 순서와 같은 우선순위"""
+        assert classify("날씨 알려줘, 안녕") == "greet"
+        assert classify("시간이랑 이름") == "name"
+
+    def test_generate_response(self, matcher):
+        """응답 문장 생성 테스트"""
+        assert generate_response("안녕") == "안녕하세요! 음성 대화 시스템입니다."
+        assert generate_response("시간").startswith("현재 시간은")
+        assert generate_response("무슨 말") == DEFAULT_RESPONSE
@@ -4,7 +4,6 @@ WebSocket 핸들러 통합 테스트
 
 import pytest
 import json
-import base64
 import asyncio
 from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
@@ -31,24 +30,22 @@ class TestWebSocketHandlers:
 
             await _handle_ping(mock_websocket, message_data)
 
-            # pong 응답이 전송되었는지 확인
-            mock_manager.send_personal_message.assert_called_once()
-            call_args = mock_manager.send_personal_message.call_args[0]
-            response_data = json.loads(call_args[0])
+            # pong 응답이 송신 큐에 들어갔는지 확인
+            mock_manager.queue_message.assert_called_once()
+            response_data = mock_manager.queue_message.call_args[0][0]
 
             assert response_data["type"] == "pong"
             assert response_data["timestamp"] == "2025-09-29T14:38:00Z"
 
     @pytest.mark.asyncio
-    async def test_audio_message_processing(self, sample_audio_file):
+    async def test_audio_message_processing(self, sample_audio_b64):
         """오디오 메시지 처리 테스트"""
         mock_websocket = AsyncMock()
         mock_manager = AsyncMock()
         mock_model_manager = MagicMock()
 
-        # 오디오 파일을 base64로 인코딩
-        with open(sample_audio_file, "rb") as f:
-            audio_data = base64.b64encode(f.read()).decode()
+        # 미리 인코딩된 base64 오디오 사용
+        audio_data = sample_audio_b64
 
         # STT 결과 모킹
         mock_model_manager.transcribe_audio.return_value = {
@@ -82,17 +79,16 @@ class TestWebSocketHandlers:
             mock_model_manager.synthesize_speech.assert_called_once()
 
             # 두 개의 메시지가 전송되었는지 확인 (사용자 메시지 + 시스템 응답)
-            assert mock_manager.send_personal_message.call_count == 2
+            assert mock_manager.queue_message.call_count == 2
 
     @pytest.mark.asyncio
     async def test_websocket_connection_lifecycle(self):
         """WebSocket 연결 라이프사이클 테스트"""
         mock_websocket = AsyncMock()
-        mock_manager = MagicMock()
+        mock_manager = AsyncMock()
 
-        # receive_text가 WebSocketDisconnect를 발생시키도록 설정
-        from fastapi import WebSocketDisconnect
-        mock_websocket.receive_text.side_effect = WebSocketDisconnect()
+        # 첫 수신에서 연결 종료 메시지를 받도록 설정
+        mock_websocket.receive.return_value = {"type": "websocket.disconnect", "code": 1000}
 
         with patch('websocket.chat_handler.manager', mock_manager), \
              patch('websocket.chat_handler.auto_chat_manager') as mock_auto_chat:
@@ -103,7 +99,7 @@ class TestWebSocketHandlers:
 
             # 연결 및 해제가 호출되었는지 확인
             mock_manager.connect.assert_called_once_with(mock_websocket)
-            mock_manager.disconnect.assert_called_once_with(mock_websocket)
+            mock_manager.flush_and_disconnect.assert_called_once_with(mock_websocket)
 
     @pytest.mark.asyncio
     async def test_invalid_json_message(self):
@@ -112,19 +108,19 @@ class TestWebSocketHandlers:
         mock_manager = MagicMock()
 
         # 잘못된 JSON을 반환하도록 설정
-        mock_websocket.receive_text.side_effect = [
-            "invalid json",
-            json.dumps({"type": "ping"})  # 두 번째 호출에서는 정상 메시지
+        mock_websocket.receive.side_effect = [
+            {"type": "websocket.receive", "text": "invalid json"},
+            {"type": "websocket.receive", "text": json.dumps({"type": "ping"})},  # 두 번째 호출에서는 정상 메시지
+            {"type": "websocket.disconnect", "code": 1000}  # 세 번째 호출에서 연결 해제
         ]
 
-        # 세 번째 호출에서 연결 해제
-        def side_effect():
-            from fastapi import WebSocketDisconnect
-            raise WebSocketDisconnect()
-        mock_websocket.receive_text.side_effect.append(side_effect)
+        mock_manager.connect = AsyncMock()
+        mock_manager.flush_and_disconnect = AsyncMock()
 
         with patch('websocket.chat_handler.manager', mock_manager), \
-             patch('websocket.chat_handler.auto_chat_manager'):
+             patch('websocket.chat_handler.auto_chat_manager') as mock_auto_chat:
+
+            mock_auto_chat.stop_auto_chat_for_websocket = AsyncMock()
 
             # JSON 파싱 에러가 발생해도 연결이 유지되어야 함
             try:
@@ -132,6 +128,36 @@ class TestWebSocketHandlers:
             except Exception:
                 pass  # WebSocketDisconnect 예외는 정상적인 종료
 
+            # 비정상 종료여도 연결 정리(송신 writer 태스크 해제)는 반드시 수행
+            mock_manager.flush_and_disconnect.assert_called_once_with(mock_websocket)
+
+    @pytest.mark.asyncio
+    async def test_binary_audio_frame(self):
+        """audio_header 다음 바이너리 프레임으로 온 오디오 처리 테스트"""
+        mock_websocket = AsyncMock()
+        mock_manager = MagicMock()
+        mock_manager.connect = AsyncMock()
+        mock_manager.flush_and_disconnect = AsyncMock()
+
+        mock_websocket.receive.side_effect = [
+            {"type": "websocket.receive", "text": json.dumps({"type": "audio_header", "timestamp": "t1"})},
+            {"type": "websocket.receive", "bytes": b"RIFF0000WAVE"},
+            {"type": "websocket.disconnect", "code": 1000}
+        ]
+
+        with patch('websocket.chat_handler.manager', mock_manager), \
+             patch('websocket.chat_handler.auto_chat_manager') as mock_auto_chat, \
+             patch('websocket.chat_handler._process_audio_message', new_callable=AsyncMock) as mock_process:
+
+            mock_auto_chat.stop_auto_chat_for_websocket = AsyncMock()
+
+            await handle_chat_websocket(mock_websocket)
+
+            # 헤더와 원본 바이트가 Base64 없이 그대로 전달되어야 함
+            mock_process.assert_called_once_with(
+                mock_websocket, {"type": "audio_header", "timestamp": "t1"}, b"RIFF0000WAVE"
+            )
+
 class TestConnectionManager:
     """연결 매니저 테스트"""
 
@@ -179,6 +205,46 @@ class TestConnectionManager:
         mock_websocket1.send_text.assert_called_once_with("broadcast message")
         mock_websocket2.send_text.assert_called_once_with("broadcast message")
 
+    @pytest.mark.asyncio
+    async def test_queue_message_batching(self):
+        """송신 큐 배치 전송 테스트"""
+        manager = ConnectionManager()
+        mock_websocket = AsyncMock()
+
+        await manager.connect(mock_websocket)
+
+        # writer 태스크가 돌기 전에 쌓인 메시지는 한 프레임으로 묶여야 함
+        await manager.queue_message({"type": "user_message"}, mock_websocket)
+        await manager.queue_message({"type": "system_response"}, mock_websocket)
+        await asyncio.sleep(0)
+
+        mock_websocket.send_text.assert_called_once()
+        payload = json.loads(mock_websocket.send_text.call_args[0][0])
+        assert payload["type"] == "batch"
+        assert [item["type"] for item in payload["items"]] == ["user_message", "system_response"]
+
+        # 메시지가 하나뿐이면 감싸지 않고 그대로 전송
+        await manager.queue_message({"type": "pong"}, mock_websocket)
+        await asyncio.sleep(0)
+
+        assert json.loads(mock_websocket.send_text.call_args[0][0]) == {"type": "pong"}
+
+        manager.disconnect(mock_websocket)
+
+    @pytest.mark.asyncio
+    async def test_flush_and_disconnect_sends_pending(self):
+        """연결 해제 전에 송신 큐에 남은 메시지를 모두 보내는지 테스트"""
+        manager = ConnectionManager()
+        mock_websocket = AsyncMock()
+
+        await manager.connect(mock_websocket)
+        await manager.queue_message({"type": "system_response"}, mock_websocket)
+        await manager.flush_and_disconnect(mock_websocket)
+
+        mock_websocket.send_text.assert_called_once()
+        assert json.loads(mock_websocket.send_text.call_args[0][0])["type"] == "system_response"
+        assert mock_websocket not in manager.active_connections
+
     @pytest.mark.asyncio
     async def test_connection_error_handling(self):
         """연결 오류 처리 테스트"""
@@ -209,19 +275,18 @@ class TestWebSocketIntegration:
         assert response.status_code in [404, 405, 426]  # 426 = Upgrade Required
 
     @pytest.mark.slow
-    def test_websocket_connection_with_testclient(self, client):
+    def test_websocket_connection_with_testclient(self, fresh_ws):
         """TestClient를 통한 WebSocket 연결 테스트"""
-        with client.websocket_connect("/ws/chat") as websocket:
-            # 핑 메시지 전송
-            ping_data = {
-                "type": "ping",
-                "timestamp": "2025-09-29T14:38:00Z"
-            }
-            websocket.send_text(json.dumps(ping_data))
+        # 핑 메시지 전송
+        ping_data = {
+            "type": "ping",
+            "timestamp": "2025-09-29T14:38:00Z"
+        }
+        fresh_ws.send_text(json.dumps(ping_data))
 
-            # pong 응답 수신
-            response = websocket.receive_text()
-            response_data = json.loads(response)
+        # pong 응답 수신
+        response = fresh_ws.receive_text()
+        response_data = json.loads(response)
 
-            assert response_data["type"] == "pong"
-            assert response_data["timestamp"] == "2025-09-29T14:38:00Z"
\ No newline at end of file
+        assert response_data["type"] == "pong"
+        assert response_data["timestamp"] == "2025-09-29T14:38:00Z"
\ No newline at end of file
@@ -3,8 +3,11 @@
 오디오 전처리 유틸리티 모듈
 """
 
+import io
 import os
 import subprocess
+from functools import lru_cache
+from importlib.util import find_spec
 import numpy as np
 from config.settings import (
     AUDIO_SAMPLE_RATE,
@@ -13,12 +16,66 @@ from config.settings import (
     AUDIO_VOLUME_NORMALIZE
 )
 
-try:
+# librosa는 numba/scipy까지 끌고 와 import가 무거우므로 설치 여부만 확인하고 실제 전처리 시점에 로드
+AUDIO_PROCESSING_AVAILABLE = find_spec("librosa") is not None and find_spec("soundfile") is not None
+NUMBA_AVAILABLE = find_spec("numba") is not None
+
+@lru_cache(maxsize=1)
+def _normalize_gate_kernel():
+    """정규화 + 노이즈 게이트 Numba 커널 (첫 전처리 시점에 컴파일, numba가 없으면 None)"""
+    if not NUMBA_AVAILABLE:
+        return None
+
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def kernel(y, vol_norm, thr_ratio):
+        peak = 0.0
+        for i in prange(y.shape[0]):
+            peak = max(peak, abs(y[i]))
+        if peak == 0.0:
+            return
+
+        scale = vol_norm / peak
+        thr = vol_norm * thr_ratio
+        for i in prange(y.shape[0]):
+            v = y[i] * scale
+            y[i] = 0.0 if abs(v) < thr else v
+
+    return kernel
+
+def _normalize_gate(y, vol_norm, thr_ratio):
+    """볼륨 정규화(최대값 → vol_norm) 후 vol_norm * thr_ratio 미만 샘플을 0으로 (y를 제자리에서 수정)"""
+    kernel = _normalize_gate_kernel()
+    if kernel is not None and y.ndim == 1:
+        kernel(y, vol_norm, thr_ratio)
+        return y
+
+    peak = np.abs(y).max()
+    if peak > 0:
+        np.multiply(y, vol_norm / peak, out=y)
+        y[np.abs(y) < vol_norm * thr_ratio] = 0.0
+    return y
+
+def _trim_and_clean(y: np.ndarray, sr: int):
+    """무음 제거 + 볼륨 정규화/노이즈 게이트 (처리할 음성이 없으면 None)"""
     import librosa
-    import soundfile as sf
-    AUDIO_PROCESSING_AVAILABLE = True
-except ImportError:
-    AUDIO_PROCESSING_AVAILABLE = False
+
+    # 음성이 너무 짧으면 처리하지 않음
+    if len(y) < sr * 0.1:  # 0.1초 미만
+        return None
+
+    # 무음 구간 제거 (앞뒤)
+    y_trimmed, _ = librosa.effects.trim(y, top_db=AUDIO_TRIM_TOP_DB)
+
+    # 음성이 없는 경우
+    if len(y_trimmed) == 0:
+        return None
+
+    # 볼륨 정규화 + 간단한 노이즈 게이트 (매우 작은 소리 제거)를 한 번에 제자리 처리
+    return _normalize_gate(
+        np.ascontiguousarray(y_trimmed), AUDIO_VOLUME_NORMALIZE, AUDIO_NOISE_GATE_THRESHOLD
+    )
 
 def preprocess_audio(audio_path: str) -> str:
     """오디오 전처리: 노이즈 제거 및 정규화"""
@@ -26,30 +83,16 @@ def preprocess_audio(audio_path: str) -> str:
         if not AUDIO_PROCESSING_AVAILABLE:
             return audio_path
 
+        import librosa
+        import soundfile as sf
+
         # librosa로 오디오 로드 (자동 샘플링 레이트 변환)
         y, sr = librosa.load(audio_path, sr=AUDIO_SAMPLE_RATE, mono=True)
 
-        # 음성이 너무 짧으면 패딩
-        if len(y) < sr * 0.1:  # 0.1초 미만
-            return audio_path
-
-        # 무음 구간 제거 (앞뒤)
-        y_trimmed, _ = librosa.effects.trim(y, top_db=AUDIO_TRIM_TOP_DB)
-
-        # 음성이 없는 경우 원본 반환
-        if len(y_trimmed) == 0:
+        y_cleaned = _trim_and_clean(y, sr)
+        if y_cleaned is None:
             return audio_path
 
-        # 볼륨 정규화
-        if np.max(np.abs(y_trimmed)) > 0:
-            y_normalized = y_trimmed / np.max(np.abs(y_trimmed)) * AUDIO_VOLUME_NORMALIZE
-        else:
-            y_normalized = y_trimmed
-
-        # 간단한 노이즈 게이트 (매우 작은 소리 제거)
-        threshold = np.max(np.abs(y_normalized)) * AUDIO_NOISE_GATE_THRESHOLD
-        y_cleaned = np.where(np.abs(y_normalized) < threshold, 0, y_normalized)
-
         # 전처리된 오디오를 임시 파일로 저장
         processed_path = audio_path.replace('.webm', '_processed.webm')
         sf.write(processed_path, y_cleaned, sr)
@@ -60,19 +103,37 @@ def preprocess_audio(audio_path: str) -> str:
         print(f"오디오 전처리 오류: {e}")
         return audio_path  # 전처리 실패시 원본 반환
 
+def decode_audio_bytes(data: bytes, sr: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+    """압축 오디오(WebM 등) 바이트를 float32 모노 배열로 디코딩 (임시 파일 없이 메모리에서 처리)"""
+    # PyAV(faster-whisper 의존성)가 있으면 프로세스 안에서 디코딩
+    if find_spec("faster_whisper") is not None:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(io.BytesIO(data), sampling_rate=sr)
+
+    # 없으면 ffmpeg 파이프로 디코딩 (stdin → s16le stdout)
+    cmd = [
+        "ffmpeg", "-loglevel", "error", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "pipe:1"
+    ]
+    out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    audio = np.frombuffer(out, np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
 
 def cleanup_temp_audio(audio_path: str):
     """임시 오디오 파일 정리"""
-    try:
-        if os.path.exists(audio_path):
-            os.unlink(audio_path)
-
-        # 전처리된 파일도 정리
-        processed_path = audio_path.replace('.webm', '_processed.webm')
-        if os.path.exists(processed_path):
-            os.unlink(processed_path)
-    except Exception as e:
-        print(f"임시 파일 정리 오류: {e}")
+    # 존재 여부를 먼저 확인하지 않고 바로 삭제 (없으면 무시) - stat 호출 1회 절약
+    processed_path = audio_path.replace('.webm', '_processed.webm')
+    for path in (audio_path, processed_path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"임시 파일 정리 오류: {e}")
 
 
 def generate_audio_filename() -> str:
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+모델 추론 동시 실행 슬롯
+
+웹 서버(REST/WebSocket)와 실시간 STT 스트리밍이 같은 세마포어를 공유해
+프로세스 전체의 동시 추론 수가 MODEL_CONCURRENCY를 넘지 않도록 한다.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+# CPU 추론 기본 슬롯 수 - 각 추론이 이미 BLAS/OpenMP 스레드로 물리 코어를 모두 쓰므로 작게 유지
+CPU_MODEL_CONCURRENCY = 2
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def configure_model_slots(on_gpu: bool) -> int:
+    """동시 추론 슬롯 수를 정하고 공유 세마포어를 다시 만든 뒤 그 값을 반환
+
+    환경 변수 MODEL_CONCURRENCY가 있으면 그 값을, 없으면 GPU 1개(VRAM OOM 방지) / CPU 2개를 사용한다.
+    요청을 받기 전(모듈 로드 시점)에 호출해야 한다.
+    """
+    global _semaphore
+    default = 1 if on_gpu else CPU_MODEL_CONCURRENCY
+    concurrency = max(1, int(os.environ.get("MODEL_CONCURRENCY", default)))
+    _semaphore = asyncio.Semaphore(concurrency)
+    return concurrency
+
+def model_slots() -> asyncio.Semaphore:
+    """공유 추론 세마포어 (설정 전이면 CPU 기본값으로 생성)"""
+    if _semaphore is None:
+        configure_model_slots(on_gpu=False)
+    return _semaphore
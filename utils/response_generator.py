@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+키워드 기반 간단한 응답 생성 모듈
+"""
+
+import datetime
+from functools import lru_cache
+
+try:
+    import ahocorasick  # pyahocorasick (설치된 경우)
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# (키워드, 태그) - 태그 순서가 곧 우선순위
+KEYWORDS = [
+    ("안녕", "greet"), ("hello", "greet"),
+    ("날씨", "weather"), ("weather", "weather"),
+    ("이름", "name"), ("name", "name"),
+    ("시간", "time"), ("time", "time"),
+]
+
+RESPONSES = {
+    "greet": "안녕하세요! 음성 대화 시스템입니다.",
+    "weather": "오늘 날씨는 좋네요!",
+    "name": "저는 음성 대화 시스템입니다.",
+}
+
+DEFAULT_RESPONSE = "네, 잘 들었습니다."
+
+_PRIORITY = {tag: i for i, tag in enumerate(dict.fromkeys(tag for _, tag in KEYWORDS))}
+
+@lru_cache(maxsize=1)
+def _automaton():
+    """키워드 Aho-Corasick 오토마톤 (최초 호출 시 한 번만 생성)"""
+    automaton = ahocorasick.Automaton()
+    for keyword, tag in KEYWORDS:
+        automaton.add_word(keyword, tag)
+    automaton.make_automaton()
+    return automaton
+
+def classify(user_text: str):
+    """발화에 포함된 키워드 중 우선순위가 가장 높은 태그 반환 (없으면 None)"""
+    user_text = user_text.lower()
+
+    if AHOCORASICK_AVAILABLE:
+        # 한 번의 선형 스캔으로 모든 키워드 매칭
+        tags = {tag for _, tag in _automaton().iter(user_text)}
+    else:
+        tags = {tag for keyword, tag in KEYWORDS if keyword in user_text}
+
+    return min(tags, key=_PRIORITY.__getitem__, default=None)
+
+def generate_response(user_text: str) -> str:
+    """간단한 응답 생성 (추후 AI 모델로 확장 가능)"""
+    tag = classify(user_text)
+
+    if tag == "time":
+        now = datetime.datetime.now()
+        return f"현재 시간은 {now.strftime('%H시 %M분')}입니다."
+    return RESPONSES.get(tag, DEFAULT_RESPONSE)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+BLAS/OpenMP 스레드 설정 유틸리티
+
+numpy/torch/ctranslate2가 스레드 풀을 만들기 전에 적용되어야 하므로
+이 모듈은 무거운 라이브러리를 import하지 않는다.
+"""
+
+import os
+
+def configure_threads() -> int:
+    """BLAS/OpenMP 스레드 수를 물리 코어 수로 고정하고 그 값을 반환
+
+    기본값(논리 코어당 1스레드)은 작은 텐서 연산에서 스레드 경합만 늘린다.
+    numpy/torch/ctranslate2 import 전에 호출해야 하며, 사용자가 이미 지정한 환경 변수는 그대로 둔다.
+    """
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False)
+    except ImportError:
+        physical = None
+    physical = physical or os.cpu_count() or 1
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS",
+                "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+        os.environ.setdefault(var, str(physical))
+    os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+    return physical
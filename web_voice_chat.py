@@ -7,14 +7,18 @@ Speech-to-Text + Text-to-Speech 실시간 대화
 import os
 import sys
 import asyncio
-import tempfile
 import warnings
-import json
 import uuid
+import time
+import hashlib
 import subprocess
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List
-import base64
+from typing import Optional
+try:
+    from pybase64 import b64decode  # SIMD 가속 base64 디코더 (설치된 경우)
+except ImportError:
+    from base64 import b64decode
 
 warnings.filterwarnings("ignore")
 
@@ -25,6 +29,7 @@ from fastapi import FastAPI, File, UploadFile, WebSocket, WebSocketDisconnect, H
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+import numpy as np
 import uvicorn
 
 # TTS 관련 임포트
@@ -35,17 +40,32 @@ try:
 except ImportError:
     TTS_AVAILABLE = False
 
-# STT 관련 임포트 (Whisper만 - WebM 직접 처리)
+# STT 관련 임포트 (Faster Whisper - CTranslate2 INT8 추론)
 try:
-    import whisper
+    import ctranslate2
+    from faster_whisper import WhisperModel
     STT_AVAILABLE = True
+    # GPU면 int8 가중치 + FP16 연산, CPU면 INT8 GEMM
+    STT_DEVICE = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    STT_COMPUTE_TYPE = "int8_float16" if STT_DEVICE == "cuda" else "int8"
 except ImportError:
     STT_AVAILABLE = False
 
+# Whisper transcribe 공통 옵션
+WHISPER_TRANSCRIBE_OPTIONS = {
+    "language": "ko",  # 한국어 기본 설정
+    "beam_size": 1,  # greedy 디코딩
+    "temperature": 0.0,  # 일관된 결과를 위해 temperature 0
+    "compression_ratio_threshold": 2.4,
+    "log_prob_threshold": -1.0,
+    "no_speech_threshold": 0.6,
+    "vad_filter": True  # 무음 구간은 Silero VAD로 제거 (별도 트림/노이즈 게이트 불필요)
+}
+
 
 # 실시간 STT 서비스 임포트
 try:
-    from streaming_stt_service import streaming_stt_service, TranscriptionResult
+    from streaming_stt_service import stt_model as streaming_stt_model, StreamingSession, TranscriptionResult
     STREAMING_STT_AVAILABLE = True
 except ImportError:
     STREAMING_STT_AVAILABLE = False
@@ -54,6 +74,11 @@ except ImportError:
 # 자동 대화 관련 임포트
 from auto_chat_manager import auto_chat_manager
 from conversation_patterns import conversation_patterns
+from websocket.connection_manager import ConnectionManager, dumps, loads, receive_frame
+from utils.audio_processing import decode_audio_bytes
+from utils.response_generator import generate_response
+from utils.model_slots import configure_model_slots, model_slots
+from config.settings import UVICORN_OPTIONS
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -68,8 +93,26 @@ app = FastAPI(
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # 전역 변수
-tts_model = None
+tts_model = None  # 기본(KR) TTS 모델
+tts_device = None
 stt_model = None
+
+# 언어/디바이스별 TTS 모델 LRU 캐시: (language, device) -> (asyncio.Lock, TTS, 파라미터 바이트 수)
+# 모델별 Lock으로 같은 모델에 대한 동시 합성을 직렬화 (MeloTTS는 스레드 안전하지 않음)
+TTS_CACHE_BUDGET_MB = int(os.environ.get("TTS_CACHE_BUDGET_MB", "4096"))
+_tts_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_tts_cache_lock = asyncio.Lock()  # 캐시 조회/삽입/해제에만 사용 (모델 로드 중에는 잡지 않음)
+_tts_loading: "dict[tuple, asyncio.Future]" = {}  # 로드 중인 key → Future (같은 모델 중복 로드 방지)
+
+# 합성 결과 캐시: 같은 (text, language, speed, speaker_id)는 한 번만 합성하고 파일을 재사용
+TTS_AUDIO_CACHE_DIR = "static/audio/cache"
+TTS_AUDIO_CACHE_MAX_AGE_S = int(os.environ.get("TTS_AUDIO_CACHE_MAX_AGE_S", "86400"))
+TTS_AUDIO_URL_CACHE_SIZE = 256
+_tts_url_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (audio_url, 생성 시각)
+
+# 블로킹 모델 추론(STT/TTS)은 스레드에서 실행하고 동시 실행 수를 제한 (실시간 STT 스트리밍과 슬롯 공유)
+_MODEL_ON_GPU = (TTS_AVAILABLE and torch.cuda.is_available()) or (STT_AVAILABLE and STT_DEVICE == "cuda")
+MODEL_CONCURRENCY = configure_model_slots(_MODEL_ON_GPU)
 connected_clients = []
 
 # 요청/응답 모델
@@ -110,27 +153,197 @@ class AutoChatUpdateRequest(BaseModel):
     theme: Optional[str] = None
     interval: Optional[int] = None
 
+def _model_size_bytes(model) -> int:
+    """모델 파라미터 메모리 크기 (추정 실패 시 0)"""
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except Exception:
+        return 0
+
+async def get_tts(language: str, device: str):
+    """(language, device) TTS 모델과 전용 Lock 반환 - 캐시에 없으면 로드하고 예산 초과분은 오래된 순으로 해제
+
+    로드는 전역 Lock 밖에서 수행하므로 한 언어의 느린 첫 로드가 다른 언어의 캐시 적중을 막지 않음
+    """
+    key = (language, device)
+    async with _tts_cache_lock:
+        entry = _tts_cache.get(key)
+        if entry is not None:
+            _tts_cache.move_to_end(key)
+            return entry[0], entry[1]
+
+        loading = _tts_loading.get(key)
+        if loading is None:
+            loading = _tts_loading[key] = asyncio.get_running_loop().create_future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        # 같은 모델을 로드 중인 요청이 있으면 그 결과를 기다림
+        return await asyncio.shield(loading)
+
+    try:
+        model = await asyncio.to_thread(TTS, language=language, device=device)
+    except BaseException as e:
+        async with _tts_cache_lock:
+            _tts_loading.pop(key, None)
+        if isinstance(e, asyncio.CancelledError):
+            loading.cancel()
+        else:
+            loading.set_exception(e)
+            loading.exception()  # 대기자가 없어도 "never retrieved" 경고가 나지 않도록 조회 처리
+        raise
+
+    async with _tts_cache_lock:
+        _tts_loading.pop(key, None)
+        _tts_cache[key] = (asyncio.Lock(), model, _model_size_bytes(model))
+
+        # 메모리 예산 초과 시 가장 오래 사용하지 않은 모델부터 제거 (방금 로드한 모델은 유지)
+        budget = TTS_CACHE_BUDGET_MB * 1024 * 1024
+        while len(_tts_cache) > 1 and sum(e[2] for e in _tts_cache.values()) > budget:
+            evicted_key, _ = _tts_cache.popitem(last=False)
+            print(f"♻️ TTS 모델 캐시 해제: {evicted_key}")
+
+        result = (_tts_cache[key][0], model)
+    loading.set_result(result)
+    return result
+
+async def synthesize_to_url(text: str, language: str, speed: float, device: str, speaker_id: int = 0) -> str:
+    """텍스트를 합성해 오디오 URL 반환 (같은 요청은 캐시된 파일을 재사용)"""
+    key = hashlib.blake2b(
+        f"{text}|{language}|{speed}|{speaker_id}".encode(), digest_size=16
+    ).hexdigest()
+    now = time.time()
+
+    # 메모리 캐시 적중 시 stat 호출도 생략
+    hit = _tts_url_cache.get(key)
+    if hit is not None and now - hit[1] < TTS_AUDIO_CACHE_MAX_AGE_S:
+        _tts_url_cache.move_to_end(key)
+        return hit[0]
+
+    audio_path = os.path.join(TTS_AUDIO_CACHE_DIR, f"{key}.wav")
+    try:
+        created_at = os.stat(audio_path).st_mtime
+    except FileNotFoundError:
+        created_at = None
+
+    if created_at is None or now - created_at >= TTS_AUDIO_CACHE_MAX_AGE_S:
+        lock, model = await get_tts(language, device)
+
+        # 임시 파일에 합성한 뒤 원자적으로 교체 (동시 요청이 반쯤 쓰인 파일을 보지 않도록)
+        temp_path = os.path.join(TTS_AUDIO_CACHE_DIR, f"{key}.{uuid.uuid4().hex}.tmp.wav")
+        try:
+            async with lock, model_slots():
+                await asyncio.to_thread(
+                    model.tts_to_file,
+                    text=text,
+                    speaker_id=speaker_id,
+                    output_path=temp_path,
+                    speed=speed,
+                    quiet=True
+                )
+            os.replace(temp_path, audio_path)
+        except BaseException:
+            # 공개 디렉토리에 반쯤 쓰인 임시 파일이 남지 않도록 정리
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        created_at = time.time()
+
+    audio_url = f"/static/audio/cache/{key}.wav"
+    _tts_url_cache[key] = (audio_url, created_at)
+    _tts_url_cache.move_to_end(key)
+    if len(_tts_url_cache) > TTS_AUDIO_URL_CACHE_SIZE:
+        _tts_url_cache.popitem(last=False)
+    return audio_url
+
+# 워밍업용 짧은 문장 (길이가 다른 입력으로 커널/autotune 캐시를 미리 채움)
+WARMUP_TEXTS = ["안녕하세요.", "오늘 날씨는 정말 좋네요."]
+
+def _warmup_tts(model):
+    """더미 합성으로 CUDA 초기화/cuDNN autotune 비용을 첫 요청 대신 시작 단계에서 처리"""
+    try:
+        with torch.inference_mode():
+            for text in WARMUP_TEXTS:
+                model.tts_to_file(text=text, speaker_id=0, output_path=None, speed=2.0, quiet=True)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+    except Exception as e:
+        print(f"⚠️ TTS 워밍업 실패 (무시): {e}")
+
+def _warmup_stt(model):
+    """1초 무음으로 STT 추론을 한 번 실행 (VAD가 무음을 걸러내지 않도록 vad_filter 해제)"""
+    try:
+        silence = np.zeros(16000, dtype=np.float32)
+        options = {**WHISPER_TRANSCRIBE_OPTIONS, "vad_filter": False}
+        segments, _ = model.transcribe(silence, **options)
+        list(segments)  # faster-whisper는 세그먼트를 지연 생성하므로 소비해야 실제로 디코딩됨
+    except Exception as e:
+        print(f"⚠️ STT 워밍업 실패 (무시): {e}")
+
 # 모델 초기화
 async def initialize_models():
-    """TTS와 STT 모델 초기화"""
-    global tts_model, stt_model
+    """TTS와 STT 모델 초기화 (로드 후 워밍업까지 수행)"""
+    global tts_model, tts_device, stt_model
 
     if TTS_AVAILABLE:
         try:
             device = 'cuda' if torch.cuda.is_available() else 'cpu'
-            tts_model = TTS(language="KR", device=device)
+            if device == 'cuda':
+                # HiFi-GAN conv autotune + TF32 matmul
+                torch.backends.cudnn.benchmark = True
+                torch.set_float32_matmul_precision('high')
+            else:
+                # CPU 추론 스레드가 STT/이벤트 루프와 코어를 다투지 않도록 절반만 사용
+                torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+            _, tts_model = await get_tts("KR", device)
+            tts_device = device
+            await asyncio.to_thread(_warmup_tts, tts_model)
             print(f"✅ TTS 모델 로드 완료 (device: {device})")
         except Exception as e:
             print(f"❌ TTS 모델 로드 실패: {e}")
 
     if STT_AVAILABLE:
         try:
-            # 더 나은 한국어 지원을 위해 medium 모델 사용 (다운로드 시간이 오래 걸리므로 base로 임시 설정)
-            stt_model = whisper.load_model("base")
-            print("✅ STT 모델 로드 완료 (medium - 한국어 최적화)")
+            if STREAMING_STT_AVAILABLE:
+                # 실시간 STT 서비스와 같은 base 모델을 공유 (모델을 두 번 올리지 않음)
+                await streaming_stt_model.initialize()
+                stt_model = streaming_stt_model.model
+                device, compute_type = streaming_stt_model.device, streaming_stt_model.compute_type
+            else:
+                # 더 나은 한국어 지원을 위해 medium 모델 사용 (다운로드 시간이 오래 걸리므로 base로 임시 설정)
+                stt_model = WhisperModel("base", device=STT_DEVICE, compute_type=STT_COMPUTE_TYPE)
+                device, compute_type = STT_DEVICE, STT_COMPUTE_TYPE
+            await asyncio.to_thread(_warmup_stt, stt_model)
+            print(f"✅ STT 모델 로드 완료 (base, {device}/{compute_type})")
         except Exception as e:
             print(f"❌ STT 모델 로드 실패: {e}")
 
+def transcribe_audio_bytes(audio_data: bytes) -> dict:
+    """오디오 바이트를 Faster Whisper로 변환 (디스크를 거치지 않고 메모리에서 디코딩한 배열을 전달)
+
+    호출부 호환을 위해 openai-whisper와 같은 {"text", "segments", "language"} 형태로 반환
+    """
+    audio_np = decode_audio_bytes(audio_data)
+    segments, info = stt_model.transcribe(audio_np, **WHISPER_TRANSCRIBE_OPTIONS)
+    segments = [
+        {"start": seg.start, "end": seg.end, "text": seg.text, "avg_logprob": seg.avg_logprob}
+        for seg in segments
+    ]
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": info.language
+    }
+
+async def transcribe_audio(audio_data: bytes) -> dict:
+    """transcribe_audio_bytes를 이벤트 루프 밖 스레드에서 실행 (동시 추론 수는 공유 model_slots로 제한)"""
+    async with model_slots():
+        return await asyncio.to_thread(transcribe_audio_bytes, audio_data)
+
 @app.on_event("startup")
 async def startup_event():
     """서버 시작시 모델 초기화"""
@@ -139,13 +352,14 @@ async def startup_event():
     # 실시간 STT 서비스 초기화
     if STREAMING_STT_AVAILABLE:
         try:
-            await streaming_stt_service.initialize()
+            await streaming_stt_model.initialize()
             print("✅ 실시간 STT 서비스 초기화 완료")
         except Exception as e:
             print(f"❌ 실시간 STT 서비스 초기화 실패: {e}")
 
     # static 디렉토리 생성
     os.makedirs("static/audio", exist_ok=True)
+    os.makedirs(TTS_AUDIO_CACHE_DIR, exist_ok=True)
     os.makedirs("templates", exist_ok=True)
 
 @app.get("/", response_class=HTMLResponse)
@@ -177,8 +391,6 @@ async def get_index():
           description="입력된 텍스트를 음성 파일로 변환합니다.")
 async def text_to_speech(request: TTSRequest):
     """텍스트를 음성으로 변환"""
-    global tts_model
-
     if not TTS_AVAILABLE or not tts_model:
         raise HTTPException(status_code=503, detail="TTS 서비스를 사용할 수 없습니다")
 
@@ -189,26 +401,12 @@ async def text_to_speech(request: TTSRequest):
         else:
             device = request.device
 
-        # 필요시 모델 재로드
-        if hasattr(tts_model, 'device') and str(tts_model.device) != device:
-            tts_model = TTS(language=request.language, device=device)
-
-        # WAV 파일 생성
-        audio_filename = f"audio_{uuid.uuid4().hex}.wav"
-        audio_path = f"static/audio/{audio_filename}"
-
-        # TTS 변환
-        tts_model.tts_to_file(
-            text=request.text,
-            speaker_id=0,
-            output_path=audio_path,
-            speed=request.speed,
-            quiet=True
-        )
+        # TTS 변환 (언어/디바이스별 캐시된 모델, 같은 요청은 캐시된 파일 재사용)
+        audio_url = await synthesize_to_url(request.text, request.language, request.speed, device)
 
         return TTSResponse(
             success=True,
-            audio_url=f"/static/audio/{audio_filename}"
+            audio_url=audio_url
         )
 
     except Exception as e:
@@ -238,44 +436,16 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
         if len(content) < 100:
             raise HTTPException(status_code=400, detail="오디오 파일이 너무 작습니다")
 
-        # WebM 데이터를 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-            temp_file.write(content)
-            webm_path = temp_file.name
+        # WebM 데이터 유효성 검증
+        if b'\x1a\x45\xdf\xa3' not in content[:32]:  # EBML header 확인
+            raise HTTPException(status_code=400, detail="유효하지 않은 WebM 파일입니다")
 
-        # WebM 파일 유효성 검증
-        try:
-            with open(webm_path, 'rb') as f:
-                header = f.read(32)
-                if b'\x1a\x45\xdf\xa3' not in header:  # EBML header 확인
-                    raise HTTPException(status_code=400, detail="유효하지 않은 WebM 파일입니다")
-        except Exception as validation_error:
-            if os.path.exists(webm_path):
-                os.unlink(webm_path)
-            raise HTTPException(status_code=400, detail=f"WebM 파일 검증 실패: {str(validation_error)}")
-
-        # STT 변환 (WebM 직접 처리)
+        # STT 변환 (임시 파일 없이 메모리에서 디코딩한 배열을 바로 전달)
         try:
-            result = stt_model.transcribe(
-                webm_path,
-                language="ko",  # 한국어 기본 설정
-                word_timestamps=True,
-                fp16=False,  # 안정성을 위해 fp16 비활성화
-                temperature=0.0,  # 일관된 결과를 위해 temperature 0
-                compression_ratio_threshold=2.4,
-                logprob_threshold=-1.0,
-                no_speech_threshold=0.6
-            )
+            result = await transcribe_audio(content)
         except Exception as transcribe_error:
-            # 임시 WebM 파일 삭제
-            if os.path.exists(webm_path):
-                os.unlink(webm_path)
             raise HTTPException(status_code=500, detail=f"STT 처리 오류: {str(transcribe_error)}")
 
-        # 임시 WebM 파일 삭제
-        if os.path.exists(webm_path):
-            os.unlink(webm_path)
-
         return STTResponse(
             success=True,
             text=result["text"].strip()
@@ -433,16 +603,25 @@ streamingWs.onmessage = (event) => {
                 "description": "STT + TTS + 대화 시스템 통합",
                 "message_format": {
                     "send": {
-                        "type": "audio | auto_chat_start | auto_chat_stop | auto_chat_message",
+                        "type": "audio_header | audio | auto_chat_start | auto_chat_stop | auto_chat_message",
                         "data": "message_data",
                         "theme": "optional_for_auto_chat",
                         "interval": "optional_for_auto_chat"
                     },
+                    "send_audio": {
+                        "header": {"type": "audio_header", "timestamp": "timestamp"},
+                        "body": "<바이너리 프레임: WebM 오디오 원본 (Base64 아님)>",
+                        "legacy": {"type": "audio", "data": "<base64_encoded_audio>", "timestamp": "timestamp"}
+                    },
                     "receive": {
-                        "type": "user_message | system_response | auto_message_response | error",
+                        "type": "user_message | system_response | auto_message_response | error | batch",
                         "text": "메시지 내용",
                         "audio_url": "음성 파일 URL (해당하는 경우)",
                         "timestamp": "timestamp"
+                    },
+                    "receive_batch": {
+                        "type": "batch",
+                        "items": ["<위 receive 형식의 메시지들 (보낸 순서대로)>"]
                     }
                 },
                 "features": [
@@ -468,7 +647,9 @@ streamingWs.onmessage = (event) => {
         },
         "common_message_types": {
             "ping": "연결 상태 확인 (모든 WebSocket에서 지원)",
-            "pong": "ping에 대한 응답"
+            "pong": "ping에 대한 응답",
+            "batch": "/ws/chat에서 한꺼번에 준비된 여러 메시지를 하나의 텍스트 프레임으로 묶은 것 - items를 순서대로 처리",
+            "audio_header": "/ws/chat 오디오 전송 헤더 - 바로 다음 바이너리 프레임이 WebM 오디오 본문"
         },
         "connection_examples": {
             "legacy_stt": "ws://localhost:6001/ws/stt",
@@ -528,7 +709,7 @@ async def get_streaming_stt_status():
     if not STREAMING_STT_AVAILABLE:
         raise HTTPException(status_code=503, detail="스트리밍 STT 서비스를 사용할 수 없습니다")
 
-    return streaming_stt_service.get_stats()
+    return streaming_stt_model.get_stats()
 
 @app.post("/api/streaming-stt/test",
           summary="스트리밍 STT 테스트",
@@ -542,15 +723,16 @@ async def test_streaming_stt(audio_file: UploadFile = File(...)):
         # 오디오 데이터 읽기
         content = await audio_file.read()
 
-        # 스트리밍 STT 서비스에 추가
-        streaming_stt_service.add_audio_chunk(content, time.time())
+        # 요청 전용 세션에 추가 (모델은 공유)
+        session = streaming_stt_model.create_session()
+        session.add_audio_chunk(content, time.time())
 
         # 잠시 대기 후 결과 수집 (테스트용)
         results = []
         timeout = 10  # 10초 타임아웃
         start_time = time.time()
 
-        async for result in streaming_stt_service.process_stream():
+        async for result in session.process_stream():
             results.append({
                 "text": result.text,
                 "confidence": result.confidence,
@@ -609,25 +791,7 @@ async def compare_stt_performance():
         }
     }
 
-# WebSocket 연결 관리
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
+# WebSocket 연결 관리 (연결별 송신 큐 + writer 태스크)
 manager = ConnectionManager()
 
 # WebSocket STT 전용 응답 모델 (Swagger용)
@@ -754,13 +918,13 @@ async def websocket_stt_legacy(websocket: WebSocket):
         while True:
             # 클라이언트로부터 메시지 수신
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = loads(data)
 
             if message_data["type"] == "audio":
                 # 음성 데이터를 텍스트로 변환
                 try:
                     if not STT_AVAILABLE or not stt_model:
-                        await manager.send_personal_message(json.dumps({
+                        await manager.send_personal_message(dumps({
                             "type": "error",
                             "error": "STT 서비스를 사용할 수 없습니다",
                             "timestamp": message_data.get("timestamp", "")
@@ -768,24 +932,10 @@ async def websocket_stt_legacy(websocket: WebSocket):
                         continue
 
                     # Base64 오디오 디코딩
-                    audio_data = base64.b64decode(message_data["data"])
-
-                    # WebM 데이터를 임시 파일로 저장
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-                        temp_file.write(audio_data)
-                        webm_path = temp_file.name
-
-                    # STT 변환 (WebM 직접 처리)
-                    result = stt_model.transcribe(
-                        webm_path,
-                        language="ko",  # 한국어 기본 설정
-                        word_timestamps=True,
-                        fp16=False,
-                        temperature=0.0,
-                        compression_ratio_threshold=2.4,
-                        logprob_threshold=-1.0,
-                        no_speech_threshold=0.6
-                    )
+                    audio_data = b64decode(message_data["data"])
+
+                    # STT 변환 (임시 파일 없이 메모리에서 처리)
+                    result = await transcribe_audio(audio_data)
                     transcribed_text = result["text"].strip()
 
                     # 신뢰도 계산 (Whisper는 세그먼트별 확률 제공)
@@ -794,12 +944,8 @@ async def websocket_stt_legacy(websocket: WebSocket):
                         confidence = sum(seg.get("avg_logprob", 0) for seg in result["segments"]) / len(result["segments"])
                         confidence = max(0, min(1, (confidence + 1) / 2))  # -1~0 범위를 0~1로 변환
 
-                    # 임시 WebM 파일 삭제
-                    if os.path.exists(webm_path):
-                        os.unlink(webm_path)
-
                     # STT 결과 전송
-                    await manager.send_personal_message(json.dumps({
+                    await manager.send_personal_message(dumps({
                         "type": "stt_result",
                         "text": transcribed_text,
                         "confidence": round(confidence, 3),
@@ -807,7 +953,7 @@ async def websocket_stt_legacy(websocket: WebSocket):
                     }), websocket)
 
                 except Exception as e:
-                    await manager.send_personal_message(json.dumps({
+                    await manager.send_personal_message(dumps({
                         "type": "error",
                         "error": f"STT 처리 오류: {str(e)}",
                         "timestamp": message_data.get("timestamp", "")
@@ -815,13 +961,16 @@ async def websocket_stt_legacy(websocket: WebSocket):
 
             elif message_data["type"] == "ping":
                 # 연결 상태 확인
-                await manager.send_personal_message(json.dumps({
+                await manager.send_personal_message(dumps({
                     "type": "pong",
                     "timestamp": message_data.get("timestamp", "")
                 }), websocket)
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        # 어떤 이유로 끝나든 남은 송신 메시지를 보내고 연결 정리
+        await manager.flush_and_disconnect(websocket)
 
 @app.websocket("/ws/streaming-stt")
 async def websocket_streaming_stt(websocket: WebSocket):
@@ -839,36 +988,40 @@ async def websocket_streaming_stt(websocket: WebSocket):
     """
     await manager.connect(websocket)
     print(f"🎤 실시간 STT 클라이언트 연결: {websocket.client}")
-
-    if not STREAMING_STT_AVAILABLE:
-        await manager.send_personal_message(json.dumps({
-            "type": "error",
-            "error": "실시간 STT 서비스를 사용할 수 없습니다"
-        }), websocket)
-        return
+    processing_task = None
 
     try:
+        if not STREAMING_STT_AVAILABLE:
+            await manager.send_personal_message(dumps({
+                "type": "error",
+                "error": "실시간 STT 서비스를 사용할 수 없습니다"
+            }), websocket)
+            return
+
+        # 연결마다 독립된 큐를 가진 세션 (Whisper 모델은 공유)
+        session = streaming_stt_model.create_session()
+
         # 스트리밍 STT 처리 태스크 시작
         processing_task = asyncio.create_task(
-            process_streaming_stt(websocket)
+            process_streaming_stt(websocket, session)
         )
 
         while True:
             # 클라이언트로부터 메시지 수신
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = loads(data)
 
             if message_data["type"] == "audio_chunk":
                 try:
                     # Base64 오디오 디코딩
-                    audio_data = base64.b64decode(message_data["data"])
+                    audio_data = b64decode(message_data["data"])
                     timestamp = message_data.get("timestamp", time.time())
 
                     # 스트리밍 STT 서비스에 오디오 청크 추가
-                    streaming_stt_service.add_audio_chunk(audio_data, timestamp)
+                    session.add_audio_chunk(audio_data, timestamp)
 
                 except Exception as e:
-                    await manager.send_personal_message(json.dumps({
+                    await manager.send_personal_message(dumps({
                         "type": "error",
                         "error": f"오디오 청크 처리 오류: {str(e)}",
                         "timestamp": message_data.get("timestamp", "")
@@ -876,7 +1029,7 @@ async def websocket_streaming_stt(websocket: WebSocket):
 
             elif message_data["type"] == "start_stream":
                 # 스트림 시작 신호
-                await manager.send_personal_message(json.dumps({
+                await manager.send_personal_message(dumps({
                     "type": "stream_started",
                     "message": "실시간 STT 스트림이 시작되었습니다"
                 }), websocket)
@@ -884,7 +1037,7 @@ async def websocket_streaming_stt(websocket: WebSocket):
             elif message_data["type"] == "stop_stream":
                 # 스트림 중지 신호
                 processing_task.cancel()
-                await manager.send_personal_message(json.dumps({
+                await manager.send_personal_message(dumps({
                     "type": "stream_stopped",
                     "message": "실시간 STT 스트림이 중지되었습니다"
                 }), websocket)
@@ -892,25 +1045,25 @@ async def websocket_streaming_stt(websocket: WebSocket):
 
             elif message_data["type"] == "ping":
                 # 연결 상태 확인
-                await manager.send_personal_message(json.dumps({
+                await manager.send_personal_message(dumps({
                     "type": "pong",
                     "timestamp": message_data.get("timestamp", "")
                 }), websocket)
 
     except WebSocketDisconnect:
         print("🔌 실시간 STT 클라이언트 연결 해제")
-        if 'processing_task' in locals():
-            processing_task.cancel()
-        manager.disconnect(websocket)
     except Exception as e:
         print(f"❌ 실시간 STT WebSocket 오류: {e}")
-        if 'processing_task' in locals():
+    finally:
+        # 어떤 이유로 끝나든(stop_stream, 오류 포함) 처리 태스크를 멈추고 남은 송신 메시지를 보낸 뒤 연결 정리
+        if processing_task is not None:
             processing_task.cancel()
+        await manager.flush_and_disconnect(websocket)
 
-async def process_streaming_stt(websocket: WebSocket):
+async def process_streaming_stt(websocket: WebSocket, session: "StreamingSession"):
     """실시간 STT 결과 처리 및 전송"""
     try:
-        async for result in streaming_stt_service.process_stream():
+        async for result in session.process_stream():
             # 결과를 클라이언트에 전송
             response = {
                 "type": "final_result" if result.is_final else "partial_result",
@@ -922,7 +1075,7 @@ async def process_streaming_stt(websocket: WebSocket):
             }
 
             await manager.send_personal_message(
-                json.dumps(response, ensure_ascii=False),
+                dumps(response),
                 websocket
             )
 
@@ -930,90 +1083,87 @@ async def process_streaming_stt(websocket: WebSocket):
         print("🛑 실시간 STT 처리 태스크 취소됨")
     except Exception as e:
         print(f"❌ 실시간 STT 처리 오류: {e}")
-        await manager.send_personal_message(json.dumps({
+        await manager.send_personal_message(dumps({
             "type": "error",
             "error": f"STT 처리 오류: {str(e)}"
         }), websocket)
 
+async def _process_chat_audio(websocket: WebSocket, message_data: dict, audio_data: bytes):
+    """음성 데이터 처리 (STT -> 응답 생성 -> TTS)"""
+    try:
+        # STT 처리
+        if STT_AVAILABLE and stt_model:
+            # STT 변환 (임시 파일 없이 메모리에서 처리)
+            result = await transcribe_audio(audio_data)
+            user_text = result["text"].strip()
+
+            # 사용자 메시지 전송
+            await manager.queue_message({
+                "type": "user_message",
+                "text": user_text,
+                "timestamp": message_data.get("timestamp", "")
+            }, websocket)
+
+            # 자동 대화 매니저에 사용자 입력 알림
+            await auto_chat_manager.handle_user_input(websocket, user_text)
+
+            # 간단한 응답 생성 (실제로는 AI 모델 연동 가능)
+            response_text = generate_response(user_text)
+
+            # TTS 변환
+            if TTS_AVAILABLE and tts_model:
+                audio_url = await synthesize_to_url(response_text, "KR", 2.0, tts_device)
+
+                # 시스템 응답 전송
+                await manager.queue_message({
+                    "type": "system_response",
+                    "text": response_text,
+                    "audio_url": audio_url,
+                    "timestamp": message_data.get("timestamp", "")
+                }, websocket)
+
+    except Exception as e:
+        await manager.queue_message({
+            "type": "error",
+            "message": f"처리 오류: {str(e)}"
+        }, websocket)
+
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
-    """실시간 음성 대화 WebSocket"""
+    """실시간 음성 대화 WebSocket
+
+    오디오는 {"type": "audio_header", ...} 텍스트 프레임 다음의 바이너리 프레임(WebM 원본)으로 받고,
+    Base64 JSON({"type": "audio", "data": ...}) 방식도 계속 지원
+    """
     await manager.connect(websocket)
+    audio_header = None
     try:
         while True:
-            # 클라이언트로부터 메시지 수신
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
+            # 클라이언트로부터 메시지 수신 (텍스트/바이너리 프레임)
+            text, data = await receive_frame(websocket)
 
-            if message_data["type"] == "audio":
-                # 음성 데이터 처리 (Base64 디코딩 -> STT -> 응답 생성 -> TTS)
-                try:
-                    # Base64 오디오 디코딩
-                    audio_data = base64.b64decode(message_data["data"])
-
-                    # STT 처리
-                    if STT_AVAILABLE and stt_model:
-                        # WebM 데이터를 임시 파일로 저장
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-                            temp_file.write(audio_data)
-                            webm_path = temp_file.name
-
-                        # STT 변환 (WebM 직접 처리)
-                        result = stt_model.transcribe(
-                            webm_path,
-                            language="ko",  # 한국어 기본 설정
-                                word_timestamps=True,
-                            fp16=False,
-                            temperature=0.0,
-                            compression_ratio_threshold=2.4,
-                            logprob_threshold=-1.0,
-                            no_speech_threshold=0.6
-                        )
-                        user_text = result["text"].strip()
-
-                        # 임시 WebM 파일 삭제
-                        if os.path.exists(webm_path):
-                            os.unlink(webm_path)
-
-                        # 사용자 메시지 전송
-                        await manager.send_personal_message(json.dumps({
-                            "type": "user_message",
-                            "text": user_text,
-                            "timestamp": message_data.get("timestamp", "")
-                        }), websocket)
+            if data is not None:
+                await _process_chat_audio(websocket, audio_header or {}, data)
+                audio_header = None
+                continue
 
-                        # 자동 대화 매니저에 사용자 입력 알림
-                        await auto_chat_manager.handle_user_input(websocket, user_text)
-
-                        # 간단한 응답 생성 (실제로는 AI 모델 연동 가능)
-                        response_text = generate_response(user_text)
-
-                        # TTS 변환
-                        if TTS_AVAILABLE and tts_model:
-                            audio_filename = f"audio_{uuid.uuid4().hex}.wav"
-                            audio_path = f"static/audio/{audio_filename}"
-
-                            tts_model.tts_to_file(
-                                text=response_text,
-                                speaker_id=0,
-                                output_path=audio_path,
-                                speed=2.0,
-                                quiet=True
-                            )
-
-                            # 시스템 응답 전송
-                            await manager.send_personal_message(json.dumps({
-                                "type": "system_response",
-                                "text": response_text,
-                                "audio_url": f"/static/audio/{audio_filename}",
-                                "timestamp": message_data.get("timestamp", "")
-                            }), websocket)
+            message_data = loads(text)
 
+            if message_data["type"] == "audio":
+                # 기존 방식: Base64로 인코딩된 오디오를 JSON에 담아 전송
+                try:
+                    audio_data = b64decode(message_data["data"])
                 except Exception as e:
-                    await manager.send_personal_message(json.dumps({
+                    await manager.queue_message({
                         "type": "error",
                         "message": f"처리 오류: {str(e)}"
-                    }), websocket)
+                    }, websocket)
+                    continue
+                await _process_chat_audio(websocket, message_data, audio_data)
+
+            elif message_data["type"] == "audio_header":
+                # 다음 바이너리 프레임이 이 헤더에 해당하는 오디오 본문
+                audio_header = message_data
 
             elif message_data["type"] == "auto_chat_start":
                 # 자동 대화 시작 요청
@@ -1023,90 +1173,66 @@ async def websocket_chat(websocket: WebSocket):
 
                     session_id = await auto_chat_manager.start_auto_chat(websocket, theme, interval)
 
-                    await manager.send_personal_message(json.dumps({
+                    await manager.queue_message({
                         "type": "auto_chat_started",
                         "session_id": session_id,
                         "theme": theme,
                         "interval": interval,
                         "message": "자동 대화가 시작되었습니다."
-                    }), websocket)
+                    }, websocket)
 
                 except Exception as e:
-                    await manager.send_personal_message(json.dumps({
+                    await manager.queue_message({
                         "type": "error",
                         "message": f"자동 대화 시작 오류: {str(e)}"
-                    }), websocket)
+                    }, websocket)
 
             elif message_data["type"] == "auto_chat_stop":
                 # 자동 대화 중지 요청
                 try:
                     stopped = await auto_chat_manager.stop_auto_chat_for_websocket(websocket)
 
-                    await manager.send_personal_message(json.dumps({
+                    await manager.queue_message({
                         "type": "auto_chat_stopped",
                         "message": "자동 대화가 중지되었습니다." if stopped else "활성 자동 대화가 없습니다."
-                    }), websocket)
+                    }, websocket)
 
                 except Exception as e:
-                    await manager.send_personal_message(json.dumps({
+                    await manager.queue_message({
                         "type": "error",
                         "message": f"자동 대화 중지 오류: {str(e)}"
-                    }), websocket)
+                    }, websocket)
 
             elif message_data["type"] == "auto_chat_message":
                 # 자동 대화 메시지를 TTS로 변환
                 try:
                     text = message_data.get("text", "")
                     if text and TTS_AVAILABLE and tts_model:
-                        audio_filename = f"audio_{uuid.uuid4().hex}.wav"
-                        audio_path = f"static/audio/{audio_filename}"
-
-                        tts_model.tts_to_file(
-                            text=text,
-                            speaker_id=0,
-                            output_path=audio_path,
-                            speed=2.0,
-                            quiet=True
-                        )
+                        audio_url = await synthesize_to_url(text, "KR", 2.0, tts_device)
 
                         # 자동 대화 메시지로 전송
-                        await manager.send_personal_message(json.dumps({
+                        await manager.queue_message({
                             "type": "auto_message_response",
                             "text": text,
-                            "audio_url": f"/static/audio/{audio_filename}",
+                            "audio_url": audio_url,
                             "timestamp": message_data.get("timestamp", ""),
                             "session_id": message_data.get("session_id", ""),
                             "theme": message_data.get("theme", "casual")
-                        }), websocket)
+                        }, websocket)
 
                 except Exception as e:
-                    await manager.send_personal_message(json.dumps({
+                    await manager.queue_message({
                         "type": "error",
                         "message": f"자동 대화 TTS 오류: {str(e)}"
-                    }), websocket)
+                    }, websocket)
 
     except WebSocketDisconnect:
-        # 연결이 끊어질 때 자동 대화도 정리
+        pass
+    finally:
+        # 어떤 이유로 끝나든 자동 대화를 멈추고, 남은 송신 메시지를 보낸 뒤 연결 정리
         await auto_chat_manager.stop_auto_chat_for_websocket(websocket)
-        manager.disconnect(websocket)
-
-
-def generate_response(user_text: str) -> str:
-    """간단한 응답 생성 (추후 AI 모델로 확장 가능)"""
-    user_text = user_text.lower()
-
-    if "안녕" in user_text or "hello" in user_text:
-        return "안녕하세요! 음성 대화 시스템입니다."
-    elif "날씨" in user_text or "weather" in user_text:
-        return "오늘 날씨는 좋네요!"
-    elif "이름" in user_text or "name" in user_text:
-        return "저는 음성 대화 시스템입니다."
-    elif "시간" in user_text or "time" in user_text:
-        import datetime
-        now = datetime.datetime.now()
-        return f"현재 시간은 {now.strftime('%H시 %M분')}입니다."
-    else:
-        return "네, 잘 들었습니다."
+        await manager.flush_and_disconnect(websocket)
+
 
 # 개발 서버 실행
 if __name__ == "__main__":
@@ -1116,4 +1242,4 @@ if __name__ == "__main__":
     print("📖 API 문서: http://localhost:6001/docs")
     print("🌐 웹 앱: http://localhost:6001")
 
-    uvicorn.run(app, host="0.0.0.0", port=6001)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=6001, **UVICORN_OPTIONS)
\ No newline at end of file
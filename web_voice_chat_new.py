@@ -15,6 +15,7 @@ import uvicorn
 from config.settings import (
     SERVER_HOST,
     SERVER_PORT,
+    UVICORN_OPTIONS,
     ensure_directories
 )
 from models.model_manager import model_manager
@@ -188,4 +189,4 @@ if __name__ == "__main__":
     print(f"🌐 웹 앱: http://{SERVER_HOST}:{SERVER_PORT}")
     print("🏗️  모듈화된 아키텍처로 업그레이드 완료!")
 
-    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT)
\ No newline at end of file
+    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT, **UVICORN_OPTIONS)
\ No newline at end of file
@@ -3,25 +3,88 @@
 WebSocket 연결 관리 모듈
 """
 
-from typing import List
-from fastapi import WebSocket
+import asyncio
+import json
+from typing import Dict, List
+from fastapi import WebSocket, WebSocketDisconnect
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 한 번에 묶어서 보낼 최대 메시지 수
+MAX_BATCH_SIZE = 128
+
+# 연결 종료 시 남은 송신 큐를 비우며 기다리는 최대 시간 (초)
+FLUSH_TIMEOUT_S = 5.0
+
+# writer 태스크에 큐를 다 비웠으면 종료하라고 알리는 표식
+_CLOSE = object()
+
+def dumps(message) -> str:
+    """WebSocket 메시지 직렬화 (클라이언트가 JSON.parse로 읽는 텍스트 프레임용 str 반환)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(message)
+
+def loads(data):
+    """WebSocket 텍스트/바이너리 프레임 역직렬화"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+async def receive_frame(websocket: WebSocket):
+    """텍스트/바이너리 프레임 수신 -> (text, bytes) 중 하나만 값이 있음, 연결 종료 시 WebSocketDisconnect"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message.get("text"), message.get("bytes")
 
 class ConnectionManager:
     """WebSocket 연결 관리자"""
 
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        # 연결별 송신 큐와 큐를 비우는 writer 태스크
+        self._queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket):
         """클라이언트 연결"""
         await websocket.accept()
         self.active_connections.append(websocket)
 
+        queue = asyncio.Queue()
+        self._queues[websocket] = queue
+        self._writers[websocket] = asyncio.create_task(self._drain(websocket, queue))
+
+    async def flush_and_disconnect(self, websocket: WebSocket, timeout: float = FLUSH_TIMEOUT_S):
+        """송신 큐에 남은 메시지(마지막 응답/오류 등)를 모두 보낸 뒤 연결 해제
+
+        핸들러가 끝나면 소켓이 닫히므로 writer 태스크가 끝날 때까지 기다린다 (timeout 초과 시 취소)
+        """
+        queue = self._queues.get(websocket)
+        writer = self._writers.get(websocket)
+        if queue is not None and writer is not None and not writer.done():
+            queue.put_nowait(_CLOSE)
+            try:
+                await asyncio.wait_for(asyncio.shield(writer), timeout)
+            except asyncio.TimeoutError:
+                print("송신 큐 비우기 시간 초과 - 남은 메시지 폐기")
+        self.disconnect(websocket)
+
     def disconnect(self, websocket: WebSocket):
-        """클라이언트 연결 해제"""
+        """클라이언트 연결 해제 (큐에 남은 메시지는 버림 - 보내야 하면 flush_and_disconnect 사용)"""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
 
+        self._queues.pop(websocket, None)
+        writer = self._writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """개별 클라이언트에게 메시지 전송"""
         try:
@@ -30,6 +93,45 @@ class ConnectionManager:
             print(f"메시지 전송 오류: {e}")
             self.disconnect(websocket)
 
+    async def queue_message(self, message: dict, websocket: WebSocket):
+        """송신 큐에 메시지 추가 (writer 태스크가 준비된 메시지를 모아 한 프레임으로 전송)"""
+        queue = self._queues.get(websocket)
+        if queue is None:
+            # 매니저로 연결되지 않은 소켓은 바로 전송
+            await self.send_personal_message(dumps(message), websocket)
+            return
+        queue.put_nowait(message)
+
+    async def _drain(self, websocket: WebSocket, queue: asyncio.Queue):
+        """송신 큐 writer: 대기 중인 메시지를 최대 MAX_BATCH_SIZE개까지 묶어 전송
+
+        메시지가 하나뿐이면 그대로 보내고, 여러 개면 {"type": "batch", "items": [...]}로 보냄
+        """
+        closing = False
+        while not closing:
+            message = await queue.get()
+            if message is _CLOSE:
+                return
+            batch = [message]
+            while not queue.empty() and len(batch) < MAX_BATCH_SIZE:
+                message = queue.get_nowait()
+                if message is _CLOSE:
+                    closing = True
+                    break
+                batch.append(message)
+
+            if len(batch) == 1:
+                payload = batch[0]
+            else:
+                payload = {"type": "batch", "items": batch}
+
+            try:
+                await websocket.send_text(dumps(payload))
+            except Exception as e:
+                print(f"메시지 전송 오류: {e}")
+                self.disconnect(websocket)
+                return
+
     async def broadcast(self, message: str):
         """모든 연결된 클라이언트에게 브로드캐스트"""
         disconnected = []
@@ -49,4 +151,4 @@ class ConnectionManager:
         return len(self.active_connections)
 
 # 전역 연결 매니저 인스턴스
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
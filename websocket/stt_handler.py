@@ -3,13 +3,16 @@
 STT 전용 WebSocket 핸들러
 """
 
-import json
-import base64
+import asyncio
 import tempfile
 from fastapi import WebSocket, WebSocketDisconnect
+try:
+    from pybase64 import b64decode  # SIMD 가속 base64 디코더 (설치된 경우)
+except ImportError:
+    from base64 import b64decode
 
 from models.model_manager import model_manager
-from websocket.connection_manager import manager
+from websocket.connection_manager import manager, dumps, loads
 from utils.audio_processing import cleanup_temp_audio
 
 async def handle_stt_websocket(websocket: WebSocket):
@@ -20,7 +23,7 @@ async def handle_stt_websocket(websocket: WebSocket):
         while True:
             # 클라이언트로부터 메시지 수신
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = loads(data)
 
             if message_data["type"] == "audio":
                 await _process_audio_message(websocket, message_data)
@@ -28,20 +31,24 @@ async def handle_stt_websocket(websocket: WebSocket):
                 await _handle_ping(websocket, message_data)
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        # 어떤 이유로 끝나든 남은 송신 메시지를 보내고 연결 정리
+        await manager.flush_and_disconnect(websocket)
 
 async def _process_audio_message(websocket: WebSocket, message_data: dict):
     """오디오 메시지 처리"""
     try:
         # Base64 오디오 디코딩
-        audio_data = base64.b64decode(message_data["data"])
+        audio_data = b64decode(message_data["data"])
 
         # STT 처리 - WebM 형식으로 저장
         with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_file:
             temp_file.write(audio_data)
             temp_path = temp_file.name
 
-        result = model_manager.transcribe_audio(temp_path)
+        # 블로킹 추론은 스레드에서 실행해 다른 연결의 이벤트 루프를 막지 않음
+        result = await asyncio.to_thread(model_manager.transcribe_audio, temp_path)
         transcribed_text = result["text"].strip()
 
         # 신뢰도 계산 (Whisper는 세그먼트별 확률 제공)
@@ -54,7 +61,7 @@ async def _process_audio_message(websocket: WebSocket, message_data: dict):
         cleanup_temp_audio(temp_path)
 
         # STT 결과 전송
-        await manager.send_personal_message(json.dumps({
+        await manager.send_personal_message(dumps({
             "type": "stt_result",
             "text": transcribed_text,
             "confidence": round(confidence, 3),
@@ -62,7 +69,7 @@ async def _process_audio_message(websocket: WebSocket, message_data: dict):
         }), websocket)
 
     except Exception as e:
-        await manager.send_personal_message(json.dumps({
+        await manager.send_personal_message(dumps({
             "type": "error",
             "error": f"STT 처리 오류: {str(e)}",
             "timestamp": message_data.get("timestamp", "")
@@ -70,7 +77,7 @@ async def _process_audio_message(websocket: WebSocket, message_data: dict):
 
 async def _handle_ping(websocket: WebSocket, message_data: dict):
     """연결 상태 확인 처리"""
-    await manager.send_personal_message(json.dumps({
+    await manager.send_personal_message(dumps({
         "type": "pong",
         "timestamp": message_data.get("timestamp", "")
     }), websocket)
\ No newline at end of file